@@ -1,29 +1,50 @@
 """Main database handler code"""
 
-__all__ = ["__version__", "Database", "or_", "and_", "create_database"]
-
+__all__ = ["__version__", "Database", "or_", "and_", "create_database", "missing_indexes", "create_missing_indexes"]
+
+import copy
+import datetime
+import functools
+import hashlib
+import inspect
+import itertools
 import json
 import os
+import pickle
 import shutil
 import sqlite3
+import threading
+import time
+import uuid
+import weakref
+import zipfile
+from collections import OrderedDict, defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
 
 import numpy as np
-import pandas as pd
+import sqlalchemy
 import sqlalchemy.types as sqlalchemy_types
-import yaml
-from astropy.coordinates import SkyCoord
-from astropy.table import Table as AstropyTable
-from astropy.units.quantity import Quantity
-from sqlalchemy import Table, and_, create_engine, event, or_, text
-from sqlalchemy.engine import Engine
-from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy import Index, Table, and_, create_engine, event, literal_column, or_, select, text
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.orm import Session, declarative_base, scoped_session, sessionmaker
 from sqlalchemy.orm.query import Query
+from sqlalchemy.pool import QueuePool, StaticPool
 from sqlalchemy.schema import CreateSchema
-from tqdm import tqdm
 
 from . import FOREIGN_KEY, PRIMARY_TABLE, PRIMARY_TABLE_KEY, LOOKUP_TABLES
-from .spectra import load_spectrum
-from .utils import datetime_json_parser, deprecated_alias, get_simbad_names, json_serializer
+from .instrumentation import instrumented, span
+from .utils import deprecated_alias, get_simbad_names, json_dumps, json_lines, json_loads, json_serializer
+from .views import (
+    MATERIALIZED_VIEW_PREFIX,
+    create_materialized_view,
+    drop_materialized_view,
+    materialized_view,
+    materialized_view_storage,
+    refresh_materialized_view,
+    summary_selectable,
+)
 
 try:
     from .version import version as __version__
@@ -31,26 +52,294 @@ except ImportError:
     __version__ = ""
 
 # pylint: disable=dangerous-default-value, too-many-arguments, trailing-whitespace, abstract-method
+# Heavy dependencies (pandas, astropy, specutils, yaml, tqdm) are imported where they are used
+# to keep `import astrodbkit.astrodb` fast; see test_lazy_imports
 
 # For SQLAlchemy ORM Declarative mapping
 # User created schema should import and use astrodb.Base so that
 # create_database can properly handle them
 Base = declarative_base()
 
+# Names of coordinate columns that should be indexed, see missing_indexes
+COORDINATE_COLUMNS = ("ra", "dec")
+
+# Name of the SQLite full-text table built by Database.build_search_index
+SEARCH_INDEX_TABLE = "astrodbkit_search_index"
+
+# Single-file archives written by Database.save_archive: a zip file with one JSON Lines file per table
+# (<table>.jsonl, one row per line) and a manifest with the format version and the number of rows of each table
+ARCHIVE_FORMAT = "astrodbkit-archive"
+ARCHIVE_VERSION = 1
+ARCHIVE_MANIFEST = "manifest.json"
+ARCHIVE_COMPRESSION = {
+    "stored": zipfile.ZIP_STORED,
+    "deflated": zipfile.ZIP_DEFLATED,
+    "bzip2": zipfile.ZIP_BZIP2,
+    "lzma": zipfile.ZIP_LZMA,
+}
+
+# SQLite performance profiles (PRAGMA settings) for Database(sqlite_profile=...) and Database.sqlite_profile
+#  - default: SQLite's own defaults
+#  - read: read-heavy workloads. Uses a WAL journal (this is stored in the database file and persists),
+#    memory-mapped I/O, a 64 MB page cache and in-memory temporary storage.
+#  - bulk: loading data, used automatically by load_database and add_table_data. Does not wait for writes
+#    to reach the disk (synchronous=OFF, so a power loss during the load can corrupt the file),
+#    uses a 256 MB page cache and in-memory temporary storage.
+# All profiles set the same per-connection PRAGMAs so that switching profiles fully replaces the previous one.
+SQLITE_PROFILES = {
+    "default": {"synchronous": "FULL", "cache_size": -2000, "temp_store": "DEFAULT", "mmap_size": 0},
+    "read": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -64000,
+        "temp_store": "MEMORY",
+        "mmap_size": 268435456,
+    },
+    "bulk": {"synchronous": "OFF", "cache_size": -256000, "temp_store": "MEMORY", "mmap_size": 0},
+}
+
+
+def _reflect_table(table_name, metadata):
+    """Filter for MetaData.reflect to skip internal tables (eg, the full-text search index and its shadow tables,
+    or the storage of emulated materialized views)"""
+    return not table_name.startswith((SEARCH_INDEX_TABLE, MATERIALIZED_VIEW_PREFIX))
+
+
+def _schema_fingerprint(connection):
+    """
+    Compute a hash of the database schema, used to detect stale reflection caches.
+    For SQLite this uses the contents of sqlite_master, for PostgreSQL the information_schema and pg_indexes
+    entries for the schemas in the search path.
+
+    Parameters
+    ----------
+    connection : SQLAlchemy connection
+        Open connection to the database
+
+    Returns
+    -------
+    fingerprint : str
+        Hex digest of the schema, or None if the database type is not supported
+    """
+
+    dialect = connection.dialect.name
+    if dialect == "sqlite":
+        queries = ["SELECT type, name, tbl_name, sql FROM sqlite_master ORDER BY type, name"]
+    elif dialect == "postgresql":
+        queries = [
+            "SELECT table_schema, table_name, column_name, data_type, is_nullable, column_default "
+            "FROM information_schema.columns WHERE table_schema = ANY(current_schemas(false)) "
+            "ORDER BY table_schema, table_name, ordinal_position",
+            "SELECT tc.table_schema, tc.table_name, tc.constraint_name, tc.constraint_type, kcu.column_name "
+            "FROM information_schema.table_constraints tc LEFT JOIN information_schema.key_column_usage kcu "
+            "ON tc.constraint_name = kcu.constraint_name AND tc.table_schema = kcu.table_schema "
+            "WHERE tc.table_schema = ANY(current_schemas(false)) "
+            "ORDER BY tc.table_schema, tc.table_name, tc.constraint_name, kcu.ordinal_position",
+            "SELECT schemaname, tablename, indexname, indexdef FROM pg_indexes "
+            "WHERE schemaname = ANY(current_schemas(false)) ORDER BY schemaname, tablename, indexname",
+            "SELECT table_schema, table_name, view_definition FROM information_schema.views "
+            "WHERE table_schema = ANY(current_schemas(false)) ORDER BY table_schema, table_name",
+        ]
+    else:
+        return None
+
+    digest = hashlib.sha256()
+    digest.update(f"{sqlalchemy.__version__} {__version__} {connection.engine.url!r}".encode())
+    for query in queries:
+        for row in connection.execute(text(query)):
+            digest.update(repr(tuple(row)).encode())
+
+    return digest.hexdigest()
+
+
+def _reflect_metadata(metadata, connection, reflection_cache=None):
+    """
+    Reflect the database schema into the metadata. If a cache file is provided,
+    the reflected metadata is stored there (pickled) along with a schema fingerprint
+    and later calls load it directly as long as the schema has not changed.
+
+    Parameters
+    ----------
+    metadata : SQLAlchemy MetaData
+        Metadata to reflect into when the cache is missing or stale
+    connection : SQLAlchemy connection
+        Open connection to the database
+    reflection_cache : str
+        Path to the cache file. Default: None (no caching)
+
+    Returns
+    -------
+    metadata : SQLAlchemy MetaData
+        Reflected metadata (a new object if loaded from the cache)
+    """
+
+    fingerprint = None
+    if reflection_cache is not None:
+        fingerprint = _schema_fingerprint(connection)
+
+    if fingerprint is not None and os.path.exists(reflection_cache):
+        try:
+            with open(reflection_cache, "rb") as f:
+                cached = pickle.load(f)
+            if cached["fingerprint"] == fingerprint:
+                return cached["metadata"]
+        except (pickle.UnpicklingError, EOFError, AttributeError, ImportError, KeyError, TypeError):
+            pass  # unreadable cache; reflect again and overwrite it
+
+    metadata.reflect(connection, only=_reflect_table)
+
+    if fingerprint is not None:
+        # Write to a temporary file first so other processes never read a partial cache
+        temp_file = f"{reflection_cache}.{os.getpid()}.tmp"
+        with open(temp_file, "wb") as f:
+            pickle.dump({"fingerprint": fingerprint, "metadata": metadata}, f)
+        os.replace(temp_file, reflection_cache)
+
+    return metadata
+
+
+@instrumented("load_spectrum")
+def load_spectrum(*args, **kwargs):
+    """Wrapper for `astrodbkit.spectra.load_spectrum` that only imports specutils when first needed"""
+    from .spectra import load_spectrum as _load_spectrum  # noqa: PLC0415
+
+    return _load_spectrum(*args, **kwargs)
+
+
+def _column_dtype(column_type):
+    """Map a SQLAlchemy column type to the numpy dtype used for formatted output (None lets astropy/pandas infer it)"""
+    if isinstance(column_type, sqlalchemy_types.Boolean):
+        return np.bool_
+    if isinstance(column_type, sqlalchemy_types.Integer):
+        return np.int64
+    if isinstance(column_type, sqlalchemy_types.Float):
+        return np.float64
+    return None
+
+
+def _typed_columns(temp, column_types=None):
+    """
+    Convert SQLAlchemy result rows to column arrays, using the column types to build typed arrays directly.
+    Columns without a known numeric type are left as lists for astropy/pandas to infer.
+
+    Parameters
+    ----------
+    temp : list
+        List of SQLAlchemy result rows
+    column_types : list
+        SQLAlchemy types for each column of the result (None entries are allowed). Default: None
+
+    Returns
+    -------
+    columns : list
+        List of (values, mask) tuples, one per column. mask is None unless the column is typed and has NULL values.
+    """
+
+    if column_types is None:
+        column_types = [None] * len(temp[0])
+
+    columns = []
+    for values, column_type in zip(zip(*temp), column_types):
+        dtype = _column_dtype(column_type)
+        if dtype is None:
+            columns.append((list(values), None))
+            continue
+
+        mask = None
+        filled = values
+        if None in values:
+            mask = np.fromiter((v is None for v in values), dtype=bool, count=len(values))
+            filled = [0 if v is None else v for v in values]
+        try:
+            # same_kind casting catches results that do not match the schema type (eg, avg() of an integer column)
+            array = np.asarray(filled).astype(dtype, casting="same_kind")
+        except (TypeError, ValueError):
+            columns.append((list(values), None))
+            continue
+        if mask is not None and dtype is np.float64:
+            array[mask] = np.nan
+        columns.append((array, mask))
+
+    return columns
+
+
+def _rows_to_astropy(temp, column_types=None, **kwargs):
+    """Convert SQLAlchemy result rows to an Astropy Table, with masked columns for NULL numeric values"""
+    from astropy.table import MaskedColumn  # noqa: PLC0415
+    from astropy.table import Table as AstropyTable  # noqa: PLC0415
+
+    if len(temp) == 0:
+        return AstropyTable(temp, **kwargs)
+
+    with span("astropy", rows=len(temp)):
+        data = [
+            values if mask is None else MaskedColumn(values, mask=mask)
+            for values, mask in _typed_columns(temp, column_types)
+        ]
+        return AstropyTable(data, names=temp[0]._fields, **kwargs)
+
+
+def _rows_to_pandas(temp, column_types=None):
+    """Convert SQLAlchemy result rows to a pandas DataFrame, with nullable dtypes for NULL integer/boolean values"""
+    import pandas as pd  # noqa: PLC0415
+
+    if len(temp) == 0:
+        return pd.DataFrame(temp)
+
+    with span("pandas", rows=len(temp)):
+        # Columns are built by position, since joins can return several columns with the same name
+        data = []
+        for values, mask in _typed_columns(temp, column_types):
+            if mask is not None and values.dtype == np.int64:
+                data.append(pd.arrays.IntegerArray(values, mask))
+            elif mask is not None and values.dtype == np.bool_:
+                data.append(pd.arrays.BooleanArray(values, mask))
+            else:
+                data.append(values)
+        df = pd.DataFrame(dict(enumerate(data)))
+        df.columns = temp[0]._fields
+        return df
+
+
+class _ReadSession(Session):
+    """
+    Session used by Database.query in threads other than the one that created the Database.
+    A read that starts a new transaction has its rows buffered and the session closed, so that the connection
+    goes back to the pool instead of being held by the thread. Explicit transactions, pending changes,
+    writes, and streamed results are left to the caller as in a regular session.
+    """
+
+    def execute(self, statement, params=None, *, execution_options=None, **kwargs):
+        release = not (self.in_transaction() or self.new or self.dirty or self.deleted)
+        result = super().execute(statement, params, execution_options=execution_options, **kwargs)
+        options = {**getattr(statement, "get_execution_options", dict)(), **(execution_options or {})}
+        streaming = options.get("yield_per") or options.get("stream_results")
+        streaming = streaming or getattr(options.get("_sa_orm_load_options"), "_yield_per", None)
+        if release and getattr(result, "returns_rows", True) and not streaming:
+            result = result.freeze()()
+            self.close()
+        return result
+
+    # Session.scalar and Session.scalars do not go through execute
+    def scalar(self, statement, params=None, *, execution_options=None, **kwargs):
+        return self.execute(statement, params, execution_options=execution_options, **kwargs).scalar()
+
+    def scalars(self, statement, params=None, *, execution_options=None, **kwargs):
+        return self.execute(statement, params, execution_options=execution_options, **kwargs).scalars()
+
 
 class AstrodbQuery(Query):
     """Subclassing the Query class to add more functionality.
     See: https://stackoverflow.com/questions/15936111/sqlalchemy-can-you-add-custom-methods-to-the-query-object
     """
 
+    def _column_types(self):
+        """Helper method to get the SQLAlchemy types of the columns returned by this query"""
+        return [c.type for c in self.statement.selected_columns]
+
     def _make_astropy(self, **kwargs):
         """Helper method to convert query results to an Astropy Table"""
-        temp = self.all()
-        if len(temp) > 0:
-            t = AstropyTable(rows=temp, names=temp[0]._fields, **kwargs)
-        else:
-            t = AstropyTable(temp, **kwargs)
-        return t
+        return _rows_to_astropy(self.all(), self._column_types(), **kwargs)
 
     def astropy(self, spectra=None, spectra_format=None, **kwargs):
         """
@@ -131,8 +420,103 @@ class AstrodbQuery(Query):
         else:
             return self.astropy(spectra=spectra, **kwargs)
 
+    def iter_batches(self, size=10000, fmt="astropy"):
+        """
+        Iterate over the query results in chunks rather than loading the full result set in memory.
+        Rows are streamed from the database (server-side cursors where supported) with SQLAlchemy's yield_per.
+
+        Parameters
+        ----------
+        size : int
+            Number of rows per chunk. Default: 10000
+        fmt : str
+            Format to return each chunk in (pandas, astropy/table, default). Default: astropy
+
+        Returns
+        -------
+        Generator of results, one per chunk
+        """
+
+        column_types = self._column_types()
+        release = isinstance(self.session, _ReadSession) and not self.session.in_transaction()
+        try:
+            result = self.session.execute(self.statement, execution_options={"yield_per": size})
+            for partition in result.partitions(size):
+                yield Database._handle_format(partition, fmt, column_types=column_types)
+        finally:
+            if release:
+                self.session.close()
+
+
+def _parse_date(value):
+    # Dates may have been saved as full datetimes
+    return datetime.datetime.fromisoformat(value).date()
+
+
+def _temporal_columns(table):
+    """
+    Find the date/time columns of a table
+
+    Parameters
+    ----------
+    table : SQLAlchemy Table
+        Table to check
+
+    Returns
+    -------
+    columns : dict
+        Dictionary of column name: function converting an ISO-format string to the column's Python type
+    """
+
+    parsers = {
+        datetime.datetime: datetime.datetime.fromisoformat,
+        datetime.date: _parse_date,
+        datetime.time: datetime.time.fromisoformat,
+    }
+    columns = {}
+    for column in table.columns:
+        try:
+            python_type = column.type.python_type
+        except NotImplementedError:
+            continue
+        if python_type in parsers:
+            columns[column.name] = parsers[python_type]
+    return columns
+
+
+def _engine_arguments(connection_string, connection_arguments={}, pool_arguments=None):
+    """
+    Build the keyword arguments for `sqlalchemy.create_engine`, including connection pool settings.
+    In-memory SQLite databases default to a single shared connection (StaticPool) so that
+    all threads see the same database; other databases use SQLAlchemy's default QueuePool.
+
+    Parameters
+    ----------
+    connection_string : str
+        The connection string to connect to the database
+    connection_arguments : dict
+        Additional connection arguments passed to the DBAPI connect call
+    pool_arguments : dict
+        Connection pool settings passed to create_engine, like
+        {"pool_size": 5, "max_overflow": 10, "pool_pre_ping": True, "pool_recycle": 3600}. Default: None
+
+    Returns
+    -------
+    engine_arguments : dict
+        Keyword arguments for create_engine
+    """
+
+    engine_arguments = {"connect_args": dict(connection_arguments)}
+    if connection_string.startswith("sqlite") and connection_string.split("/")[-1] in ("", ":memory:"):
+        engine_arguments["poolclass"] = StaticPool
+        engine_arguments["connect_args"].setdefault("check_same_thread", False)
+    if pool_arguments is not None:
+        engine_arguments.update(pool_arguments)
+
+    return engine_arguments
 
-def load_connection(connection_string, sqlite_foreign=True, base=None, connection_arguments={}):
+
+def load_connection(connection_string, sqlite_foreign=True, base=None, connection_arguments={}, pool_arguments=None):
     """Return session, base, and engine objects for connecting to the database.
 
     Parameters
@@ -148,6 +532,9 @@ def load_connection(connection_string, sqlite_foreign=True, base=None, connectio
     connection_arguments : dict
         Additional connection arguments, like {"check_same_thread": False}.   
         When using PostgreSQL, you may need to set {"options": "-csearch_path=SCHEMA_NAME"} to set the schema you'll be using
+    pool_arguments : dict
+        Connection pool settings, like {"pool_size": 5, "max_overflow": 10, "pool_pre_ping": True, "pool_recycle": 3600}.
+        Default: None (ie, SQLAlchemy defaults; in-memory SQLite databases share a single connection)
 
     Returns
     -------
@@ -160,7 +547,9 @@ def load_connection(connection_string, sqlite_foreign=True, base=None, connectio
         Provides a source of database connectivity and behavior.
     """
 
-    engine = create_engine(connection_string, connect_args=connection_arguments)
+    engine = create_engine(
+        connection_string, **_engine_arguments(connection_string, connection_arguments, pool_arguments)
+    )
     if not base:
         base = declarative_base()
     base.metadata.bind = engine
@@ -169,7 +558,7 @@ def load_connection(connection_string, sqlite_foreign=True, base=None, connectio
 
     # Enable foreign key checks in SQLite
     if connection_string.startswith("sqlite") and sqlite_foreign:
-        set_sqlite()
+        set_sqlite(engine)
     # elif 'postgresql' in connection_string:
     #     # Set up schema in postgres (must be lower case?)
     #     from sqlalchemy import DDL
@@ -179,19 +568,444 @@ def load_connection(connection_string, sqlite_foreign=True, base=None, connectio
     return session, base, engine
 
 
-def set_sqlite():
-    """Special overrides when using SQLite"""
+def _apply_sqlite_pragmas(dbapi_connection, pragmas):
+    """Execute the PRAGMA settings (dictionary of name: value) on a DBAPI SQLite connection"""
+    cursor = dbapi_connection.cursor()
+    for name, value in pragmas.items():
+        cursor.execute(f"PRAGMA {name}={value}")
+    cursor.close()
+
+
+def set_sqlite(engine=Engine, profile=None):
+    """
+    Special overrides when using SQLite: enables foreign key checks and, optionally, a performance profile
+    on every new connection.
+
+    Parameters
+    ----------
+    engine : SQLAlchemy Engine
+        Engine to configure. Default: the Engine class, which applies to every engine in the process
+    profile : str
+        Name of the SQLITE_PROFILES entry to apply. Default: None
+    """
     # pylint: disable=unused-argument
 
-    @event.listens_for(Engine, "connect")
+    pragmas = {"foreign_keys": "ON"}
+    if profile is not None:
+        pragmas.update(SQLITE_PROFILES[profile])
+
+    @event.listens_for(engine, "connect")
     def set_sqlite_pragma(dbapi_connection, connection_record):
         # Enable foreign key checking in SQLite
-        cursor = dbapi_connection.cursor()
-        cursor.execute("PRAGMA foreign_keys=ON")
-        cursor.close()
+        _apply_sqlite_pragmas(dbapi_connection, pragmas)
 
 
-def create_database(connection_string, drop_tables=False, felis_schema=None):
+def _memory_snapshot(connection_string):
+    """
+    Copy a file-based SQLite database into a named in-memory database with the SQLite backup API.
+    The in-memory database uses a shared cache so that every pooled connection (and thread) sees the same data.
+    It exists for as long as the returned connection is kept open.
+
+    Parameters
+    ----------
+    connection_string : str
+        Connection string of the SQLite database to copy
+
+    Returns
+    -------
+    memory_connection_string : str
+        Connection string for the in-memory copy
+    memory_connection : sqlite3.Connection
+        Connection that keeps the in-memory database alive
+    """
+
+    url = make_url(connection_string)
+    if url.get_backend_name() != "sqlite" or url.database in (None, "", ":memory:"):
+        raise RuntimeError("In-memory snapshots are only available for file-based SQLite databases")
+    if not os.path.exists(url.database):
+        raise RuntimeError(f"Database file {url.database} not found")
+
+    name = f"astrodbkit_{uuid.uuid4().hex}"
+    memory_connection = sqlite3.connect(f"file:{name}?mode=memory&cache=shared", uri=True, check_same_thread=False)
+    file_connection = sqlite3.connect(url.database)
+    file_connection.backup(memory_connection)
+    file_connection.close()
+
+    return f"sqlite:///file:{name}?mode=memory&cache=shared&uri=true", memory_connection
+
+
+def _set_query_only(dbapi_connection, connection_record):
+    """Connect listener that makes SQLite connections read-only"""
+    # pylint: disable=unused-argument
+    _apply_sqlite_pragmas(dbapi_connection, {"query_only": "ON"})
+
+
+def _bulk_profile(method):
+    """Decorator to run a Database method with the bulk-load SQLite profile"""
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.sqlite_profile("bulk"):
+            return method(self, *args, **kwargs)
+
+    return wrapper
+
+
+def _prefetch(function, items, max_workers=4, queue_size=64):
+    """
+    Apply a function to items with a pool of reader threads, yielding the results in order.
+    Readers work ahead of the consumer through a bounded queue of at most queue_size pending results,
+    so that reading overlaps with processing without holding everything in memory.
+    """
+    items = iter(items)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = deque(executor.submit(function, item) for item in itertools.islice(items, queue_size))
+        try:
+            while pending:
+                result = pending.popleft().result()
+                for item in itertools.islice(items, 1):
+                    pending.append(executor.submit(function, item))
+                yield result
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+class _ResultCache:
+    """Thread-safe least-recently-used cache of query results with optional expiry, used by Database"""
+
+    def __init__(self, max_size=128, ttl=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # key: (expiry time, tables, result)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        # Return (True, result) for a valid entry, (False, None) otherwise
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (entry[0] is None or entry[0] > time.monotonic()):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, entry[2]
+            if entry is not None:
+                del self._entries[key]  # expired
+                self.evictions += 1
+            self.misses += 1
+            return False, None
+
+    def put(self, key, tables, result):
+        expiry = None if self.ttl is None else time.monotonic() + self.ttl
+        with self._lock:
+            self._entries[key] = (expiry, tables, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, tables=None):
+        # Drop entries that depend on any of the tables (entries without known tables depend on all of them)
+        with self._lock:
+            if tables is None:
+                self._entries.clear()
+                return
+            for key in [k for k, v in self._entries.items() if v[1] is None or len(v[1] & set(tables)) > 0]:
+                del self._entries[key]
+
+    def info(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+            }
+
+
+# Conversion from proper motions in mas/yr to radians/yr
+_MAS_PER_YEAR = np.pi / 180 / 3600 / 1000
+
+
+def _julian_year(epoch):
+    # Epoch as a Julian year (eg, 2016.0), from an astropy Time or a number
+    if type(epoch).__name__ == "Time":
+        return float(epoch.jyear)
+    return float(epoch)
+
+
+class _CoordinateArrays:
+    """
+    Coordinates of the rows of a table as unit vectors, used by Database for cone searches and cross-matches.
+    With proper motions, positions propagated to the most recently used epochs are also kept,
+    as well as spatial trees for nearest neighbour searches.
+    """
+
+    max_epochs = 8
+
+    def __init__(self, keys, vectors, frame, motions=None, epochs=None):
+        self.keys = keys  # values of the key column of each row
+        self.vectors = vectors  # (N, 3) unit vectors in frame
+        self.frame = frame  # frame of the vectors, without data
+        self.motions = motions  # (N, 3) proper motion vectors in radians/yr, or None
+        self.epochs = epochs  # (N,) Julian year of each position, or None
+        self._propagated = OrderedDict()
+        self._trees = OrderedDict()
+        self._lock = threading.Lock()
+
+    def at_epoch(self, epoch=None):
+        """
+        Unit vectors of the positions propagated to an epoch (Julian year) with their proper motions,
+        moving along the tangent plane and normalizing. Default: None (positions as stored)
+        """
+        if epoch is None or self.motions is None:
+            return self.vectors
+        with self._lock:
+            if epoch in self._propagated:
+                self._propagated.move_to_end(epoch)
+                return self._propagated[epoch]
+
+        vectors = self.vectors + self.motions * (epoch - self.epochs)[:, np.newaxis]
+        vectors /= np.linalg.norm(vectors, axis=1)[:, np.newaxis]
+        with self._lock:
+            self._propagated[epoch] = vectors
+            while len(self._propagated) > self.max_epochs:
+                self._propagated.popitem(last=False)
+        return vectors
+
+    def tree(self, epoch=None):
+        """scipy cKDTree of the unit vectors at an epoch (see at_epoch), built once per epoch"""
+        from scipy.spatial import cKDTree  # noqa: PLC0415
+
+        with self._lock:
+            if epoch in self._trees:
+                self._trees.move_to_end(epoch)
+                return self._trees[epoch]
+
+        tree = cKDTree(self.at_epoch(epoch))
+        with self._lock:
+            self._trees[epoch] = tree
+            while len(self._trees) > self.max_epochs:
+                self._trees.popitem(last=False)
+        return tree
+
+
+def _unit_vectors(coords):
+    # Contiguous (N, 3) array of unit vectors for the positions of a SkyCoord, ignoring distances and velocities
+    from astropy.coordinates import UnitSphericalRepresentation  # noqa: PLC0415
+
+    data = coords.data.without_differentials().represent_as(UnitSphericalRepresentation)
+    return np.ascontiguousarray(data.to_cartesian().xyz.value.T.reshape(-1, 3), dtype=np.float64)
+
+
+def _chord_to_arcsec(chord):
+    # Angular separation in arcseconds of unit vectors a given chord length apart
+    return np.degrees(2 * np.arcsin(np.minimum(chord / 2, 1))) * 3600
+
+
+def _angle_column(column, unit):
+    # Values of a catalog coordinate column as a Quantity, using its own unit if it has one; masked values are NaN
+    from astropy.units import Quantity, Unit  # noqa: PLC0415
+
+    if isinstance(column, Quantity):
+        return column
+    column_unit = getattr(column, "unit", None) or Unit(unit)
+    return Quantity(np.ma.filled(np.ma.asanyarray(column).astype(np.float64), np.nan), column_unit)
+
+
+def _cone_matches(vectors, targets, max_chord):
+    """
+    Find the pairs of target and row unit vectors separated by at most a chord length.
+    Rows are sorted by z, so that each target is only compared with the band of rows with a close enough z.
+
+    Returns
+    -------
+    target_index, row_index : numpy.ndarray
+        Indices into targets and vectors of each matching pair
+    """
+    order = np.argsort(vectors[:, 2], kind="stable")
+    z = vectors[order, 2]
+    lower = np.searchsorted(z, targets[:, 2] - max_chord, side="left")
+    upper = np.searchsorted(z, targets[:, 2] + max_chord, side="right")
+    target_index, row_index = [np.zeros(0, dtype=np.intp)], [np.zeros(0, dtype=np.intp)]
+    for i, target in enumerate(targets):
+        candidates = order[lower[i] : upper[i]]
+        difference = vectors[candidates] - target
+        matches = candidates[np.einsum("ij,ij->i", difference, difference) <= max_chord**2]
+        target_index.append(np.full(len(matches), i, dtype=np.intp))
+        row_index.append(matches)
+    return np.concatenate(target_index), np.concatenate(row_index)
+
+
+def _catalog_matches(table, ra_col, dec_col, frame, unit, coordinates, max_chord, chunk_size):
+    """
+    Find the pairs of catalog rows and coordinate rows separated by at most a chord length.
+    The catalog is processed in chunks, each matched with a spatial tree against the tree of the coordinates.
+    Catalog rows without coordinates are skipped.
+
+    Returns
+    -------
+    catalog_index, row_index, separation : numpy.ndarray
+        Indices into the catalog and the coordinate rows of each matching pair and their separation in arcseconds,
+        sorted by catalog row and separation
+    """
+    from astropy.coordinates import SkyCoord  # noqa: PLC0415
+    from scipy.spatial import cKDTree  # noqa: PLC0415
+
+    tree = coordinates.tree()
+    catalog_index, row_index, chords = [np.zeros(0, dtype=np.intp)], [np.zeros(0, dtype=np.intp)], [np.zeros(0)]
+    for start in range(0, len(table), chunk_size):
+        chunk = table[start : start + chunk_size]
+        ra, dec = _angle_column(chunk[ra_col], unit), _angle_column(chunk[dec_col], unit)
+        good = np.flatnonzero(np.isfinite(ra.value) & np.isfinite(dec.value))
+        if len(good) == 0:
+            continue
+        targets = _unit_vectors(SkyCoord(ra[good], dec[good], frame=frame).transform_to(coordinates.frame))
+        pairs = cKDTree(targets).sparse_distance_matrix(tree, max_chord, output_type="ndarray")
+        catalog_index.append(start + good[pairs["i"]])
+        row_index.append(pairs["j"].astype(np.intp))
+        chords.append(pairs["v"])
+    catalog_index, row_index = np.concatenate(catalog_index), np.concatenate(row_index)
+    separation = _chord_to_arcsec(np.concatenate(chords))
+    order = np.lexsort((separation, catalog_index))
+    return catalog_index[order], row_index[order], separation[order]
+
+
+def _cache_key(value):
+    # Convert method arguments into a hashable key
+    if isinstance(value, dict):
+        return tuple(sorted((k, _cache_key(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_cache_key(v) for v in value)
+    if isinstance(value, np.ndarray):
+        return ("ndarray", value.dtype.str, value.shape, value.tobytes())
+    if type(value).__name__ == "SkyCoord":
+        icrs = value.icrs
+        return ("SkyCoord", _cache_key(icrs.ra.deg), _cache_key(icrs.dec.deg))
+    if type(value).__name__ == "Quantity":
+        return ("Quantity", _cache_key(np.asarray(value.value)), value.unit.to_string())
+    if type(value).__name__ == "Time":
+        return ("Time", _cache_key(np.asarray(value.jyear)))
+    try:
+        hash(value)
+    except TypeError:
+        return repr(value)
+    return value
+
+
+def _cached(tables=None):
+    """
+    Decorator to cache the results of a Database query method, if the result cache is enabled.
+    tables is a function of the method's arguments (as a dictionary) returning the names of the tables
+    the results depend on, so that writes to those tables invalidate them. Default: None (depend on all tables)
+    """
+
+    def decorator(method):
+        signature = inspect.signature(method)
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if self._result_cache is None:
+                return method(self, *args, **kwargs)
+
+            arguments = signature.bind(self, *args, **kwargs)
+            arguments.apply_defaults()
+            arguments = {k: v for k, v in arguments.arguments.items() if k not in ("self", "verbose")}
+            if arguments.get("chunksize") is not None:
+                return method(self, *args, **kwargs)  # generators are not cached
+
+            key = (method.__name__, _cache_key(arguments))
+            found, result = self._result_cache.get(key)
+            if found:
+                return copy.deepcopy(result)
+
+            result = method(self, *args, **kwargs)
+            dependencies = None if tables is None else set(tables(self, arguments))
+            self._result_cache.put(key, dependencies, copy.deepcopy(result))
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+def missing_indexes(metadata, coordinate_columns=COORDINATE_COLUMNS):
+    """
+    Report foreign key and coordinate columns that lack a secondary index.
+    A column counts as indexed if it is the first column of an existing index, unique constraint, or primary key.
+
+    Parameters
+    ----------
+    metadata : SQLAlchemy MetaData
+        Database schema to check
+    coordinate_columns : tuple
+        Names of coordinate columns to index. Default: ("ra", "dec")
+
+    Returns
+    -------
+    missing : list
+        List of (table name, column name) tuples, with table names as keys of metadata.tables
+    """
+
+    missing = []
+    for table_name, table in metadata.tables.items():
+        indexed = {index.columns.values()[0].name for index in table.indexes if len(index.columns) > 0}
+        indexed.update(
+            constraint.columns.values()[0].name
+            for constraint in table.constraints
+            if isinstance(constraint, (sqlalchemy.PrimaryKeyConstraint, sqlalchemy.UniqueConstraint))
+            and len(constraint.columns) > 0
+        )
+
+        for column in table.columns:
+            if column.name in indexed:
+                continue
+            if len(column.foreign_keys) > 0 or column.name in coordinate_columns:
+                missing.append((table_name, column.name))
+
+    return missing
+
+
+def create_missing_indexes(metadata, engine, coordinate_columns=COORDINATE_COLUMNS, verbose=False):
+    """
+    Create secondary indexes (named ix_<table>_<column>) for all foreign key and coordinate columns
+    reported by `missing_indexes`. The indexes are added to the metadata as well.
+
+    Parameters
+    ----------
+    metadata : SQLAlchemy MetaData
+        Database schema
+    engine : SQLAlchemy Engine
+        Engine connected to the database
+    coordinate_columns : tuple
+        Names of coordinate columns to index. Default: ("ra", "dec")
+    verbose : bool
+        Flag to enable diagnostic messages
+
+    Returns
+    -------
+    created : list
+        List of (table name, column name) tuples for the new indexes
+    """
+
+    created = missing_indexes(metadata, coordinate_columns=coordinate_columns)
+    for table_name, column_name in created:
+        table = metadata.tables[table_name]
+        if verbose:
+            print(f"Creating index on {table_name}.{column_name}")
+        index = Index(f"ix_{table.name}_{column_name}", table.columns[column_name])
+        index.create(bind=engine, checkfirst=True)
+
+    return created
+
+
+def create_database(
+    connection_string, drop_tables=False, felis_schema=None, pool_arguments=None, create_indexes=False
+):
     """
     Create a database from a schema that utilizes the `astrodbkit2.astrodb.Base` class.
     Some databases, eg Postgres, must already exist but any tables should be dropped.
@@ -206,10 +1020,16 @@ def create_database(connection_string, drop_tables=False, felis_schema=None):
         Flag to drop existing tables. This is needed when the schema changes. (Default: False)
     felis_schema : str
         Path to schema yaml file
+    pool_arguments : dict
+        Connection pool settings; passed to `load_connection`. Default: None
+    create_indexes : bool
+        Flag to also create secondary indexes for all foreign key and coordinate columns
+        (see `create_missing_indexes`). Default: False
     """
 
     if felis_schema is not None:
         # Felis loader requires felis_schema
+        import yaml  # noqa: PLC0415
         from felis.datamodel import Schema # noqa: PLC0415
         from felis.metadata import MetaDataBuilder # noqa: PLC0415
 
@@ -219,7 +1039,7 @@ def create_database(connection_string, drop_tables=False, felis_schema=None):
         schema_name = data["name"]  # get schema_name from the felis schema file
 
         # engine = create_engine(connection_string)
-        session, base, engine = load_connection(connection_string)
+        session, base, engine = load_connection(connection_string, pool_arguments=pool_arguments)
 
         # Schema handling for various database types
         if connection_string.startswith("sqlite"):
@@ -241,16 +1061,193 @@ def create_database(connection_string, drop_tables=False, felis_schema=None):
         metadata.create_all(bind=engine)
         base.metadata = metadata
     else:
-        session, base, engine = load_connection(connection_string, base=Base)
+        session, base, engine = load_connection(connection_string, base=Base, pool_arguments=pool_arguments)
         if drop_tables:
             base.metadata.drop_all()
         base.metadata.create_all(engine)  # this explicitly creates the database
 
+    if create_indexes:
+        create_missing_indexes(base.metadata, engine)
+
     return session, base, engine
 
 
+def _foreign_key_levels(tables):
+    # Group tables so that every table comes after the tables its foreign keys refer to.
+    # Tables within a level are independent of each other and can be copied concurrently.
+    names = {table.name for table in tables}
+    level = {}
+    for table in tables:  # tables are in dependency order (MetaData.sorted_tables)
+        parents = [
+            fk.column.table.name
+            for fk in table.foreign_keys
+            if fk.column.table.name in names and fk.column.table.name != table.name
+        ]
+        level[table.name] = 1 + max([level[name] for name in parents], default=-1)
+
+    levels = defaultdict(list)
+    for table in tables:
+        levels[level[table.name]].append(table)
+    return [levels[i] for i in sorted(levels)]
+
+
+def _copy_table_data(src_engine, dest_engine, src_table, dest_table, batch_size=10000, progress=None):
+    """
+    Stream the rows of a table from one database to another in batches.
+    Batches are written with COPY when the destination uses the psycopg (v3) PostgreSQL driver
+    and with a single executemany insert otherwise.
+
+    Parameters
+    ----------
+    src_engine : SQLAlchemy Engine
+        Engine of the source database
+    dest_engine : SQLAlchemy Engine
+        Engine of the destination database
+    src_table : SQLAlchemy Table
+        Table to read from
+    dest_table : SQLAlchemy Table
+        Table to write to
+    batch_size : int
+        Number of rows per batch. Default: 10000
+    progress : tqdm
+        Optional progress bar to update with the number of copied rows
+
+    Returns
+    -------
+    count : int
+        Number of copied rows
+    """
+
+    use_copy = dest_engine.dialect.name == "postgresql" and dest_engine.dialect.driver == "psycopg"
+    count = 0
+    with src_engine.connect() as src_conn:
+        result = src_conn.execution_options(yield_per=batch_size).execute(select(src_table))
+        keys = list(result.keys())
+        for partition in result.partitions(batch_size):
+            with dest_engine.begin() as dest_conn:
+                if use_copy:
+                    preparer = dest_engine.dialect.identifier_preparer
+                    columns = ", ".join(preparer.quote(key) for key in keys)
+                    statement = f"COPY {preparer.format_table(dest_table)} ({columns}) FROM STDIN"
+                    cursor = dest_conn.connection.cursor()
+                    with cursor.copy(statement) as copy:
+                        for row in partition:
+                            copy.write_row(tuple(row))
+                    cursor.close()
+                else:
+                    dest_conn.execute(dest_table.insert(), [dict(zip(keys, row)) for row in partition])
+
+            count += len(partition)
+            if progress is not None:
+                progress.update(len(partition))
+
+    return count
+
+
+def _immediate_foreign_keys(metadata):
+    """
+    Foreign keys that are not DEFERRABLE, which PostgreSQL checks on every row even after SET CONSTRAINTS ALL DEFERRED
+
+    Parameters
+    ----------
+    metadata : SQLAlchemy MetaData
+        Tables to check
+
+    Returns
+    -------
+    foreign_keys : list
+        Descriptions of the foreign keys, like Sources(reference)
+    """
+
+    return [
+        f"{table.name}({', '.join(constraint.column_keys)})"
+        for table in metadata.sorted_tables
+        for constraint in table.foreign_key_constraints
+        if not constraint.deferrable
+    ]
+
+
+def _foreign_key_violations(connection, metadata):
+    """
+    Find rows whose foreign key values do not match a row of the referenced table.
+    SQLite uses PRAGMA foreign_key_check; other databases use an outer join for each foreign key.
+
+    Parameters
+    ----------
+    connection : SQLAlchemy Connection
+        Connection to check with; uncommitted changes in its transaction are included
+    metadata : SQLAlchemy MetaData
+        Tables to check
+
+    Returns
+    -------
+    violations : list
+        One dictionary per row and foreign key, with the table, columns, values, and referenced table
+    """
+
+    violations = []
+    if connection.dialect.name == "sqlite":
+        foreign_key_columns = {}
+        for table_name, rowid, parent, fkid in connection.exec_driver_sql("PRAGMA foreign_key_check").fetchall():
+            if table_name not in metadata.tables:
+                continue
+            table = metadata.tables[table_name]
+            if table_name not in foreign_key_columns:
+                foreign_key_columns[table_name] = defaultdict(list)
+                for row in connection.exec_driver_sql(f'PRAGMA foreign_key_list("{table_name}")'):
+                    foreign_key_columns[table_name][row[0]].append(row[3])
+            columns = foreign_key_columns[table_name][fkid]
+            values = None
+            if rowid is not None:
+                statement = select(*[table.c[c] for c in columns]).where(literal_column("rowid") == rowid)
+                values = tuple(connection.execute(statement).one())
+            violations.append({"table": table_name, "columns": columns, "values": values, "parent": parent})
+        return violations
+
+    for table in metadata.sorted_tables:
+        for constraint in table.foreign_key_constraints:
+            parent = constraint.referred_table.alias()
+            columns = [element.parent for element in constraint.elements]
+            references = [parent.c[element.column.name] for element in constraint.elements]
+            statement = (
+                select(*columns)
+                .select_from(table.outerjoin(parent, and_(*[c == r for c, r in zip(columns, references)])))
+                .where(references[0].is_(None), *[c.is_not(None) for c in columns])
+            )
+            for row in connection.execute(statement):
+                violations.append(
+                    {
+                        "table": table.name,
+                        "columns": [c.name for c in columns],
+                        "values": tuple(row),
+                        "parent": constraint.referred_table.name,
+                    }
+                )
+    return violations
+
+
+def _format_violations(violations, limit=20):
+    """Report of foreign key violations as a string, listing up to limit of them"""
+    lines = [f"{len(violations)} foreign key violation(s):"]
+    for violation in violations[:limit]:
+        lines.append(
+            f"  {violation['table']}({', '.join(violation['columns'])}) = {violation['values']}"
+            f" not found in {violation['parent']}"
+        )
+    if len(violations) > limit:
+        lines.append(f"  ... and {len(violations) - limit} more")
+    return "\n".join(lines)
+
+
 def copy_database_schema(
-    source_connection_string, destination_connection_string, sqlite_foreign=False, ignore_tables=[], copy_data=False
+    source_connection_string,
+    destination_connection_string,
+    sqlite_foreign=False,
+    ignore_tables=[],
+    copy_data=False,
+    batch_size=10000,
+    max_workers=1,
+    verbose=False,
 ):
     """
     Copy a database schema (ie, all tables and columns) from one database to another
@@ -268,16 +1265,25 @@ def copy_database_schema(
         List of tables to not copy
     copy_data : bool
         Flag to enable copying data to the new database. Default: False
+    batch_size : int
+        Number of rows read and written per batch when copying data. Default: 10000
+    max_workers : int
+        Number of tables to copy concurrently. Tables are copied in foreign key order and only tables that
+        do not depend on each other are copied at the same time.
+        SQLite destinations and in-memory SQLite sources are always copied sequentially. Default: 1
+    verbose : bool
+        Flag to show a progress bar and the copy throughput of each table. Default: False
     """
 
     src_session, src_base, src_engine = load_connection(source_connection_string, sqlite_foreign=sqlite_foreign)
     src_metadata = src_base.metadata
-    src_metadata.reflect(bind=src_engine)
+    src_metadata.reflect(bind=src_engine, only=_reflect_table)
 
     dest_session, dest_base, dest_engine = load_connection(destination_connection_string, sqlite_foreign=sqlite_foreign)
     dest_metadata = dest_base.metadata
     dest_metadata.reflect(bind=dest_engine)
 
+    tables = []
     for table in src_metadata.sorted_tables:
         if table.name in ignore_tables:
             continue
@@ -288,13 +1294,42 @@ def copy_database_schema(
         for column in src_metadata.tables[table.name].columns:
             dest_table.append_column(column._copy())  # pylint: disable=protected-access
         dest_table.create(bind=dest_engine)
+        tables.append(table)
+
+    # Copy data in batches, one foreign key level at a time
+    if copy_data:
+        progress = None
+        if verbose:
+            from tqdm import tqdm  # noqa: PLC0415
 
-        # Copy data, row by row
-        if copy_data:
-            table_data = src_session.query(src_metadata.tables[table.name]).all()
-            for row in table_data:
-                dest_session.execute(dest_table.insert().values(row))
-            dest_session.commit()
+            with src_engine.connect() as conn:
+                total = sum(conn.execute(select(sqlalchemy.func.count()).select_from(t)).scalar() for t in tables)
+            progress = tqdm(total=total, unit="rows")
+
+        def copy_table(table):
+            start = time.perf_counter()
+            count = _copy_table_data(
+                src_engine, dest_engine, table, dest_metadata.tables[table.name], batch_size, progress
+            )
+            return table.name, count, time.perf_counter() - start
+
+        parallel = (
+            max_workers > 1
+            and dest_engine.dialect.name != "sqlite"
+            and src_engine.url.database not in (None, "", ":memory:")
+        )
+        timings = []
+        for level in _foreign_key_levels(tables):
+            if parallel and len(level) > 1:
+                with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                    timings += list(executor.map(copy_table, level))
+            else:
+                timings += [copy_table(table) for table in level]
+
+        if verbose:
+            progress.close()
+            for name, count, elapsed in timings:
+                print(f"{name}: {count} rows in {elapsed:.2f} s ({count / max(elapsed, 1e-9):.0f} rows/s)")
 
     # Explicitly close sessions/engines
     src_session.close()
@@ -318,6 +1353,15 @@ class Database:
         sqlite_foreign=True,
         connection_arguments={},
         schema=None,
+        pool_arguments=None,
+        reflection_cache=None,
+        in_memory=False,
+        read_only=False,
+        sqlite_profile="default",
+        cache_size=0,
+        cache_ttl=None,
+        json_backend="auto",
+        coordinate_cache=False,
     ):
         """
         Wrapper for database calls and utility functions
@@ -345,6 +1389,34 @@ class Database:
             Additional connection arguments, like {'check_same_thread': False}. Default: {}
         schema : str
             Helper for setting default PostgreSQL schema. Equivalent to connection_arguments={"options": f"-csearch_path={schema}"}
+        pool_arguments : dict
+            Connection pool settings, like {"pool_size": 5, "max_overflow": 10, "pool_pre_ping": True, "pool_recycle": 3600}.
+            Default: None (ie, SQLAlchemy defaults; in-memory SQLite databases share a single connection)
+        reflection_cache : str
+            Path to a file in which to cache the reflected schema. Later instantiations load the schema from it
+            instead of reflecting the database, unless the schema has changed. Supported for SQLite and PostgreSQL.
+            The file is a pickle, so only use cache files you trust. Default: None (always reflect)
+        in_memory : bool
+            Copy a file-based SQLite database into memory when connecting and work on that copy.
+            Changes are not written back to the file (see `Database.dump_sqlite`). Default: False
+        read_only : bool
+            Reject any writes to the database. Only available for SQLite databases. Default: False
+        sqlite_profile : str
+            SQLite performance profile for this database's connections; one of SQLITE_PROFILES
+            (default, read, bulk). Ignored for other databases. Default: default
+        cache_size : int
+            Number of results of search_object, query_region, and sql_query to keep in memory.
+            Writes through this database's engine invalidate the affected results, but writes from other
+            processes do not (see `Database.cache_clear`). See `Database.cache_info`. Default: 0 (no caching)
+        cache_ttl : float
+            Seconds after which cached results expire. Default: None (no expiry)
+        json_backend : str
+            JSON serializer used when saving the database (orjson, msgspec, or json); see `astrodbkit.utils.json_dumps`.
+            All produce identical files. Default: auto (the fastest installed)
+        coordinate_cache : bool
+            Keep the coordinates used by query_region in memory as arrays of unit vectors, one per coordinate table
+            and set of columns, so that repeated cone searches do not read the table again.
+            Invalidated like the result cache. Default: False
         """
 
         # Helper logic to set default postgres schema, if specified
@@ -352,28 +1424,152 @@ class Database:
             if connection_arguments.get("options") is None:
                 connection_arguments["options"] = f"-csearch_path={schema}"
 
+        if read_only and not connection_string.startswith("sqlite"):
+            raise RuntimeError("read_only is only available for SQLite databases")
+
+        self._init_state(
+            lookup_tables=lookup_tables,
+            primary_table=primary_table,
+            primary_table_key=primary_table_key,
+            foreign_key=foreign_key,
+            json_backend=json_backend,
+            cache_size=cache_size,
+            cache_ttl=cache_ttl,
+            coordinate_cache=coordinate_cache,
+        )
+
+        # Copy the database into memory, keeping a connection open so that the in-memory copy persists
+        if in_memory:
+            connection_string, self._memory_connection = _memory_snapshot(connection_string)
+            # Without close(), free the in-memory copy when this Database is garbage collected or at exit
+            weakref.finalize(self, self._memory_connection.close)
+            pool_arguments = {"poolclass": QueuePool, **(pool_arguments or {})}
+            connection_arguments = {"check_same_thread": False, **connection_arguments}
+
         if connection_string == "sqlite://":
-            self.session, self.base, self.engine = create_database(connection_string)
+            self.session, self.base, self.engine = create_database(connection_string, pool_arguments=pool_arguments)
         else:
             self.session, self.base, self.engine = load_connection(
-                connection_string, sqlite_foreign=sqlite_foreign, connection_arguments=connection_arguments
+                connection_string,
+                sqlite_foreign=sqlite_foreign,
+                connection_arguments=connection_arguments,
+                pool_arguments=pool_arguments,
             )
+        if read_only:
+            event.listen(self.engine, "connect", _set_query_only)
+
+        # Keep pooled SQLite connections in line with the active performance profile
+        if self.engine.url.get_backend_name() == "sqlite":
+            if sqlite_profile not in SQLITE_PROFILES:
+                raise RuntimeError(f"Unrecognized SQLite profile {sqlite_profile}")
+            self._sqlite_profile = sqlite_profile
+            event.listen(self.engine, "checkout", self._check_sqlite_profile)
+            event.listen(self.engine, "checkin", self._restore_sqlite_profile)
+
+        # Thread-local sessions: the creating thread keeps using self.session, other threads get their own,
+        # which return their connection to the pool after each read
+        self.session_factory = sessionmaker(bind=self.engine, query_cls=AstrodbQuery)
+        self.scoped_session = scoped_session(
+            sessionmaker(bind=self.engine, query_cls=AstrodbQuery, class_=_ReadSession)
+        )
+        self.scoped_session.registry.set(self.session)
 
         # Convenience methods and aliases
-        self.query = self.session.query
+        self.query = self.scoped_session.query
         self.save = self.save_database
         self.save_db = self.save_database
         self.load_db = self.load_database
 
         # Prep the tables
-        self.metadata = self.base.metadata
         with self.engine.connect() as conn:
-            self.metadata.reflect(conn)
+            self.metadata = _reflect_metadata(self.base.metadata, conn, reflection_cache=reflection_cache)
+        self.base.metadata = self.metadata
+
+        if self._result_cache is not None or self._coordinate_cache is not None:
+            event.listen(self.engine, "after_execute", self._invalidate_on_write)
+
+        self._prepare_tables(column_type_overrides)
+
+    def _init_state(
+        self,
+        lookup_tables=LOOKUP_TABLES,
+        primary_table=PRIMARY_TABLE,
+        primary_table_key=PRIMARY_TABLE_KEY,
+        foreign_key=FOREIGN_KEY,
+        json_backend="auto",
+        cache_size=0,
+        cache_ttl=None,
+        coordinate_cache=False,
+    ):
+        """
+        Set the settings and internal state that do not depend on the engine.
+        Used internally by `Database.__init__` and `Database._from_engine`; see `Database.__init__` for the parameters.
+        """
 
         self._lookup_tables = lookup_tables
         self._primary_table = primary_table
         self._primary_table_key = primary_table_key
         self._foreign_key = foreign_key
+        self._json_backend = json_backend
+        self._summary_tables = {}
+        self._result_cache = _ResultCache(cache_size, cache_ttl) if cache_size > 0 else None
+        self._coordinate_cache = {} if coordinate_cache else None
+        # Bumped by each invalidation, so that coordinates read before one are not stored
+        self._coordinate_generation = 0
+        self._coordinate_lock = threading.Lock()
+        # Connection keeping an in_memory copy alive
+        self._memory_connection = None
+        # Performance profile of SQLite connections (None for other databases)
+        self._sqlite_profile = None
+        # Profile switched to with Database.sqlite_profile, for the connections of the current thread only
+        self._thread_sqlite_profile = threading.local()
+        # Summary tables to refresh at the end of Database.deferred_summary_refresh, for the current thread
+        self._thread_summary_refresh = threading.local()
+
+    @classmethod
+    def _from_engine(cls, engine, metadata, column_type_overrides={}, **settings):
+        """
+        Create a Database for an existing engine and reflected metadata, without connecting to the database.
+        Caches, SQLite profiles, and thread-local sessions are not set up.
+        Used internally by `astrodbkit.asyncdb.AsyncDatabase`.
+
+        Parameters
+        ----------
+        engine : SQLAlchemy Engine
+            Engine of the database
+        metadata : SQLAlchemy MetaData
+            Reflected schema of the database
+        column_type_overrides : dict
+            Dictionary with table.column type overrides
+        settings
+            Other settings of `Database.__init__`, like primary_table or lookup_tables
+
+        Returns
+        -------
+        database : Database
+        """
+
+        database = cls.__new__(cls)
+        database._init_state(**settings)
+        database.engine = engine
+        database.metadata = metadata
+        database.session = Session(bind=engine, query_cls=AstrodbQuery)
+        database.query = database.session.query
+        database._prepare_tables(column_type_overrides)
+        return database
+
+    def _prepare_tables(self, column_type_overrides={}):
+        """
+        Set up the reflected tables: verify the database is not empty, set tables as attributes,
+        apply column type overrides, and catalogue the string columns used by `Database.search_string`
+        and the date/time columns decoded when loading JSON files.
+        Used internally by `Database.__init__`.
+
+        Parameters
+        ----------
+        column_type_overrides : dict
+            Dictionary with table.column type overrides
+        """
 
         if len(self.metadata.tables) == 0:
             print(
@@ -392,25 +1588,158 @@ class Database:
                 tab, col = k.split(".")
                 self.metadata.tables[tab].columns[col].type = v
 
+        # Catalogue of string columns for each table, used by search_string
+        self._string_columns = {
+            table: [
+                c
+                for c in self.metadata.tables[table].columns
+                if isinstance(c.type, (sqlalchemy_types.String, sqlalchemy_types.Text, sqlalchemy_types.Unicode))
+            ]
+            for table in self.metadata.tables
+        }
+
+        # Catalogue of date/time columns for each table, used when loading JSON files
+        self._temporal_columns = {
+            table: _temporal_columns(self.metadata.tables[table]) for table in self.metadata.tables
+        }
+
+    def _decode_temporal(self, table, rows):
+        """
+        Convert ISO-format strings in the date/time columns of a table to Python objects, in place.
+        Other values are left as they are, so only these columns are parsed.
+
+        Parameters
+        ----------
+        table : str
+            Name of the table the rows belong to
+        rows : list
+            List of dictionaries of column values
+
+        Returns
+        -------
+        rows : list
+            The same list of rows
+        """
+
+        columns = self._temporal_columns.get(table, {})
+        if len(columns) == 0:
+            return rows
+        for row in rows:
+            for name, parse in columns.items():
+                value = row.get(name)
+                if isinstance(value, str):
+                    try:
+                        row[name] = parse(value)
+                    except ValueError:
+                        pass
+        return rows
+
     # Generic methods
+    def session_scope(self):
+        """
+        Context manager providing a short-lived session, independent of `Database.session`.
+        The transaction is committed when the block exits (or rolled back on errors) and the session is closed.
+        This is the safest way to work with the ORM from multiple threads::
+
+            with db.session_scope() as session:
+                session.add(new_source)
+
+        Returns
+        -------
+        Context manager yielding a new session object
+        """
+        return self.session_factory.begin()
+
+    def _check_sqlite_profile(self, dbapi_connection, connection_record, connection_proxy):
+        # Pool checkout listener: apply the profile of the current thread if this connection is using a different one
+        # New connections start out with SQLite's defaults
+        # pylint: disable=unused-argument
+        profile = getattr(self._thread_sqlite_profile, "profile", None) or self._sqlite_profile
+        if connection_record.info.get("sqlite_profile", "default") != profile:
+            _apply_sqlite_pragmas(dbapi_connection, SQLITE_PROFILES[profile])
+            connection_record.info["sqlite_profile"] = profile
+
+    def _restore_sqlite_profile(self, dbapi_connection, connection_record):
+        # Pool checkin listener: connections switched to another profile go back to the pool with the database's
+        profile = connection_record.info.get("sqlite_profile", "default")
+        if dbapi_connection is not None and profile != self._sqlite_profile:
+            _apply_sqlite_pragmas(dbapi_connection, SQLITE_PROFILES[self._sqlite_profile])
+            connection_record.info["sqlite_profile"] = self._sqlite_profile
+
+    @contextmanager
+    def sqlite_profile(self, profile):
+        """
+        Context manager to temporarily switch the SQLite performance profile of the connections used by
+        the current thread. Connections used by other threads at the same time keep the database's profile,
+        and the previous profile is restored on exit. Does nothing for other databases::
+
+            with db.sqlite_profile("bulk"):
+                db.add_table_data("photometry.csv", "Photometry")
+
+        Parameters
+        ----------
+        profile : str
+            Name of the profile to use; one of SQLITE_PROFILES (default, read, bulk)
+        """
+
+        if self._sqlite_profile is None:
+            yield
+            return
+        if profile not in SQLITE_PROFILES:
+            raise RuntimeError(f"Unrecognized SQLite profile {profile}")
+
+        previous_profile = getattr(self._thread_sqlite_profile, "profile", None)
+        self._thread_sqlite_profile.profile = profile
+        try:
+            yield
+        finally:
+            self._thread_sqlite_profile.profile = previous_profile
+
     @staticmethod
-    def _handle_format(temp, fmt):
+    def _handle_format(temp, fmt, column_types=None):
         # Internal method to handle SQLAlchemy output and format it
-        if fmt.lower() in ("astropy", "table"):
-            if len(temp) > 0:
-                results = AstropyTable(rows=temp, names=temp[0]._fields)
+        # column_types are the SQLAlchemy types of the result columns, used to build typed (and masked) columns
+        with span("format", rows=len(temp), fmt=fmt):
+            if fmt.lower() in ("astropy", "table"):
+                results = _rows_to_astropy(temp, column_types)
+            elif fmt.lower() == "pandas":
+                results = _rows_to_pandas(temp, column_types)
             else:
-                results = AstropyTable(temp)
-        elif fmt.lower() == "pandas":
-            if len(temp) > 0:
-                results = pd.DataFrame(temp, columns=temp[0]._fields)
-            else:
-                results = pd.DataFrame(temp)
-        else:
-            results = temp
+                results = temp
 
         return results
 
+    def _table_column_types(self, table):
+        # Internal method to get the SQLAlchemy types for all columns of a table, in order
+        return [c.type for c in self.metadata.tables[table].columns]
+
+    def _metadata_column_types(self, column_names):
+        """
+        Look up SQLAlchemy types for result columns by name in the database metadata.
+        Names that are missing or that map to columns of different kinds across tables are returned as None.
+
+        Parameters
+        ----------
+        column_names : list
+            Names of the result columns
+
+        Returns
+        -------
+        column_types : list
+            SQLAlchemy type (or None) for each column name
+        """
+
+        known_types = {}
+        for table in self.metadata.tables.values():
+            for c in table.columns:
+                name = c.name.lower()
+                if name in known_types and _column_dtype(known_types[name]) != _column_dtype(c.type):
+                    known_types[name] = None
+                elif name not in known_types:
+                    known_types[name] = c.type
+
+        return [known_types.get(name.lower()) for name in column_names]
+
     # Inventory related methods
     def _row_cleanup(self, row):
         """
@@ -454,7 +1783,7 @@ class Database:
         else:
             column = table.columns[self._foreign_key]
 
-        results = self.session.query(table).filter(column == source_name).all()
+        results = self.query(table).filter(column == source_name).all()
 
         if results and table_name == self._primary_table:
             data_dict[table_name] = [row._asdict() for row in results]
@@ -494,6 +1823,7 @@ class Database:
 
     # Text query methods
     @deprecated_alias(format="fmt")
+    @_cached(lambda self, a: set(a["table_names"]) | {a["output_table"] or self._primary_table})
     def search_object(
         self,
         name,
@@ -560,96 +1890,551 @@ class Database:
             if k not in self.metadata.tables:
                 raise RuntimeError(f"Table {k} is not in the database")
 
-        # Get source for objects that match the provided names
-        # The following will build the filters required to query all specified tables
-        # approximately by case-insensitive names.
-        # This is not really optimized as it does separate DB calls,
-        # but is the simpler setup and at our scale is sufficient
-        matched_names = []
-        for k, col_list in table_names.items():
-            for v in col_list:
-                if fuzzy_search:
-                    filters = [self.metadata.tables[k].columns[v].ilike(f"%{n}%") for n in name]
-                else:
-                    filters = [self.metadata.tables[k].columns[v].ilike(f"{n}") for n in name]
+        # Get source for objects that match the provided names
+        # The following will build the filters required to query all specified tables
+        # approximately by case-insensitive names.
+        # This is not really optimized as it does separate DB calls,
+        # but is the simpler setup and at our scale is sufficient
+        matched_names = []
+        for k, col_list in table_names.items():
+            for v in col_list:
+                if fuzzy_search:
+                    filters = [self.metadata.tables[k].columns[v].ilike(f"%{n}%") for n in name]
+                else:
+                    filters = [self.metadata.tables[k].columns[v].ilike(f"{n}") for n in name]
+
+                # Column to be returned
+                if k == self._primary_table:
+                    output_to_match = self.metadata.tables[k].columns[self._primary_table_key]
+                else:
+                    output_to_match = self.metadata.tables[k].columns[self._foreign_key]
+
+                temp = self.query(output_to_match).filter(or_(*filters)).distinct().all()
+                matched_names += [s[0] for s in temp]
+
+        # Join the matched sources with the desired table
+        temp = (
+            self.query(self.metadata.tables[output_table])
+            .filter(self.metadata.tables[output_table].columns[match_column].in_(matched_names))
+            .all()
+        )
+
+        results = self._handle_format(temp, fmt, column_types=self._table_column_types(output_table))
+
+        return results
+
+    def search_string(self, value, fmt="table", fuzzy_search=True, verbose=True, max_workers=1, use_index=False):
+        """
+        Search an abitrary string across all string columns in the full database
+
+        Parameters
+        ----------
+        value : str
+            String to search for
+        fmt : str
+            Format to return results in (pandas, astropy/table, default). Default is astropy table
+        fuzzy_search : bool
+            Flag to perform partial searches on provided names (default: True)
+        verbose : bool
+            Output results to screen in addition to dictionary (default: True)
+        max_workers : int
+            Number of tables to search concurrently, each with its own pooled connection.
+            In-memory SQLite databases are always searched sequentially. Default: 1
+        use_index : bool
+            Search the full-text index created by `Database.build_search_index` instead of scanning every table.
+            Only available for SQLite databases. Default: False
+
+        Returns
+        -------
+        Dictionary of results, with each key being the matched table names
+        """
+
+        pattern = f"%{value}%" if fuzzy_search else f"{value}"
+
+        if use_index:
+            table_results = self._search_index(pattern)
+        else:
+            tables = [table for table in self.metadata.tables if len(self._string_columns[table]) > 0]
+            if max_workers > 1 and self.engine.url.database not in (None, "", ":memory:"):
+                with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                    temp_list = list(executor.map(lambda t: self._search_table(t, pattern), tables))
+            else:
+                temp_list = [self._search_table(table, pattern) for table in tables]
+            table_results = dict(zip(tables, temp_list))
+
+        # Append results to dictionary output in specified format, keeping the table order
+        output_dict = {}
+        for table in self.metadata.tables:
+            temp = table_results.get(table, [])
+            if len(temp) > 0:
+                results = self._handle_format(temp, fmt, column_types=self._table_column_types(table))
+                if verbose:
+                    print(table)
+                    print(results)
+                output_dict[table] = results
+
+        return output_dict
+
+    def _search_table(self, table, pattern):
+        # Internal method to query all string columns of a single table for the pattern. Used by search_string
+        filters = [c.ilike(pattern) for c in self._string_columns[table]]
+        with self.engine.connect() as conn:
+            return conn.execute(select(self.metadata.tables[table]).filter(or_(*filters)).distinct()).fetchall()
+
+    def _search_index(self, pattern):
+        """
+        Search the full-text index for the pattern and fetch the matching rows. Used by search_string.
+
+        Parameters
+        ----------
+        pattern : str
+            LIKE pattern to search for
+
+        Returns
+        -------
+        table_results : dict
+            Dictionary of matching SQLAlchemy rows, with each key being a table name
+        """
+
+        if self.engine.url.get_backend_name() != "sqlite":
+            raise RuntimeError("Full-text search index is only available for SQLite databases")
+
+        with self.engine.connect() as conn:
+            if SEARCH_INDEX_TABLE not in sa_inspect(conn).get_table_names():
+                raise RuntimeError("No search index found. Run build_search_index() first.")
+
+            matches = conn.execute(
+                text(f"SELECT DISTINCT table_name, row_id FROM {SEARCH_INDEX_TABLE} WHERE value LIKE :pattern"),
+                {"pattern": pattern},
+            ).fetchall()
+            row_ids = defaultdict(list)
+            for table, row_id in matches:
+                row_ids[table].append(row_id)
+
+            table_results = {}
+            for table, ids in row_ids.items():
+                if table not in self.metadata.tables:
+                    continue
+                table_results[table] = conn.execute(
+                    select(self.metadata.tables[table]).where(literal_column("rowid").in_(ids))
+                ).fetchall()
+
+        return table_results
+
+    def missing_indexes(self, coordinate_columns=COORDINATE_COLUMNS):
+        """
+        Report foreign key and coordinate columns that lack a secondary index. See `missing_indexes`.
+
+        Parameters
+        ----------
+        coordinate_columns : tuple
+            Names of coordinate columns to index. Default: ("ra", "dec")
+
+        Returns
+        -------
+        List of (table name, column name) tuples
+        """
+        return missing_indexes(self.metadata, coordinate_columns=coordinate_columns)
+
+    def create_indexes(self, coordinate_columns=COORDINATE_COLUMNS, verbose=False):
+        """
+        Create secondary indexes for all foreign key and coordinate columns that lack one.
+        These speed up inventory, foreign key checks, and cone searches. See `create_missing_indexes`.
+
+        Parameters
+        ----------
+        coordinate_columns : tuple
+            Names of coordinate columns to index. Default: ("ra", "dec")
+        verbose : bool
+            Flag to enable diagnostic messages
+
+        Returns
+        -------
+        List of (table name, column name) tuples for the new indexes
+        """
+        return create_missing_indexes(
+            self.metadata, self.engine, coordinate_columns=coordinate_columns, verbose=verbose
+        )
+
+    def cache_info(self):
+        """
+        Statistics of the query result cache, for monitoring
+
+        Returns
+        -------
+        info : dict
+            Dictionary with hits, misses, evictions, size, max_size, and ttl; None if caching is disabled
+        """
+        if self._result_cache is None:
+            return None
+        return self._result_cache.info()
+
+    def cache_clear(self):
+        """Remove all results from the query result cache, eg after modifying data outside of AstrodbKit methods"""
+        self._invalidate_cache()
+
+    def check_foreign_keys(self, verbose=False):
+        """
+        Check every foreign key in the database, eg after loading data with foreign key checks disabled
+
+        Parameters
+        ----------
+        verbose : bool
+            Flag to print a report of the violations. Default: False
+
+        Returns
+        -------
+        violations : list
+            One dictionary per row and foreign key that does not match a row of the referenced table,
+            with keys table, columns, values, and parent (the referenced table)
+        """
+
+        with self.engine.connect() as conn:
+            violations = _foreign_key_violations(conn, self.metadata)
+        if verbose:
+            print(_format_violations(violations))
+        return violations
+
+    @contextmanager
+    def _single_transaction(self, rebuild_indexes=False, verbose=False):
+        """
+        Connection for loading data in one transaction, with foreign keys checked once at the end.
+        SQLite disables foreign key checks until then. PostgreSQL only defers constraints created as DEFERRABLE;
+        others are still checked on every row, and the load relies on the table order to satisfy them.
+        The transaction is rolled back, and RuntimeError raised with a report, if there are violations.
+        With rebuild_indexes, non-unique indexes are dropped during the load and created again at the end.
+        """
+
+        sqlite = self.engine.dialect.name == "sqlite"
+        with self.engine.connect() as conn:
+            if sqlite:
+                # PRAGMA foreign_keys cannot be changed within a transaction, so this runs before any changes
+                foreign_keys = conn.exec_driver_sql("PRAGMA foreign_keys").scalar()
+                conn.exec_driver_sql("PRAGMA foreign_keys = OFF")
+            elif self.engine.dialect.name == "postgresql":
+                conn.exec_driver_sql("SET CONSTRAINTS ALL DEFERRED")
+                immediate = _immediate_foreign_keys(self.metadata)
+                if verbose and len(immediate) > 0:
+                    print(f"Foreign keys that are not DEFERRABLE are checked on every row: {', '.join(immediate)}")
+            try:
+                indexes = []
+                if rebuild_indexes:
+                    indexes = [
+                        index for table in self.metadata.sorted_tables for index in table.indexes if not index.unique
+                    ]
+                    for index in indexes:
+                        index.drop(conn)
+
+                yield conn
+
+                for index in indexes:
+                    index.create(conn)
+                if verbose:
+                    print("Checking foreign keys")
+                violations = _foreign_key_violations(conn, self.metadata)
+                if len(violations) > 0:
+                    raise RuntimeError("Nothing was loaded. " + _format_violations(violations))
+                conn.commit()
+            finally:
+                conn.rollback()
+                if sqlite:
+                    conn.exec_driver_sql(f"PRAGMA foreign_keys = {foreign_keys}")
+                    conn.commit()
+
+    def _invalidate_cache(self, tables=None):
+        # Drop cached results and coordinates that depend on the given tables (default: all)
+        if self._result_cache is not None:
+            self._result_cache.invalidate(tables)
+        if self._coordinate_cache is not None:
+            with self._coordinate_lock:
+                self._coordinate_generation += 1
+                for key in list(self._coordinate_cache):
+                    if tables is None or any(table in tables for table in key[0]):
+                        self._coordinate_cache.pop(key, None)
+
+    def _invalidate_on_write(self, conn, clauseelement, multiparams, params, execution_options, result):
+        # Engine listener: invalidate the caches for statements that may modify data, including ORM flushes
+        # pylint: disable=unused-argument
+        if isinstance(clauseelement, sqlalchemy.sql.dml.UpdateBase):
+            table = getattr(clauseelement.table, "name", None)
+            self._invalidate_cache(None if table is None else [table])
+        elif isinstance(clauseelement, (str, sqlalchemy.sql.elements.TextClause)):
+            statement = str(clauseelement).lstrip().lower()
+            if not statement.startswith(("select", "pragma", "explain")):
+                self._invalidate_cache()
+
+    def _coordinates(self, table, key_column, ra_col, dec_col, frame, unit, astrometry=None):
+        """
+        Coordinates of the rows of a table as unit vectors, for cone searches and cross-matches.
+        Rows without coordinates are skipped. Results are kept in the coordinate cache, if enabled.
+
+        Parameters
+        ----------
+        table : str
+            Name of the table with the coordinates
+        key_column : str
+            Column identifying the rows (eg, source)
+        ra_col, dec_col : str
+            Names of the coordinate columns
+        frame : str
+            Coordinate frame of the coordinates
+        unit : str or tuple of Unit or str
+            Unit of the coordinates
+        astrometry : tuple
+            (table, pm_ra_col, pm_dec_col, epoch_col, coordinate_epoch) to also read proper motions (mas/yr,
+            pm_ra including the cos(dec) factor) and the epochs of the positions (Julian years; coordinate_epoch
+            for rows without one or when epoch_col is None). A different table is matched on the foreign key;
+            missing proper motions are taken as 0. Default: None
+
+        Returns
+        -------
+        _CoordinateArrays
+        """
+
+        tables = (table,) if astrometry is None else (table, astrometry[0])
+        cache_key = (tables, key_column, ra_col, dec_col, frame, unit, astrometry)
+        generation = self._coordinate_generation
+        if self._coordinate_cache is not None and cache_key in self._coordinate_cache:
+            return self._coordinate_cache[cache_key]
 
-                # Column to be returned
-                if k == self._primary_table:
-                    output_to_match = self.metadata.tables[k].columns[self._primary_table_key]
-                else:
-                    output_to_match = self.metadata.tables[k].columns[self._foreign_key]
+        import pandas as pd  # noqa: PLC0415
+        from astropy.coordinates import SkyCoord  # noqa: PLC0415
 
-                temp = self.query(output_to_match).filter(or_(*filters)).distinct().all()
-                matched_names += [s[0] for s in temp]
+        t = self.metadata.tables[table]
+        with self.engine.connect() as conn:
+            rows = conn.execute(select(t.c[key_column], t.c[ra_col], t.c[dec_col])).fetchall()
+        df = pd.DataFrame(rows, columns=["key", "ra", "dec"])
+        ra = pd.to_numeric(df["ra"]).to_numpy(dtype=np.float64)  # convert everything to floats
+        dec = pd.to_numeric(df["dec"]).to_numpy(dtype=np.float64)
+        good = ~(np.isnan(ra) | np.isnan(dec))
+
+        coords = SkyCoord(ra[good], dec[good], frame=frame, unit=unit)
+        vectors = _unit_vectors(coords)
+        keys = df["key"].to_numpy()[good]
+        motions, epochs = None, None
+        if astrometry is not None:
+            motions, epochs = self._proper_motions(keys, coords, table, key_column, *astrometry)
+
+        entry = _CoordinateArrays(keys, vectors, coords.frame.replicate_without_data(), motions, epochs)
+        if self._coordinate_cache is not None:
+            with self._coordinate_lock:
+                # Skip storing if the cache was invalidated while reading, as the coordinates may be outdated
+                if self._coordinate_generation == generation:
+                    self._coordinate_cache[cache_key] = entry
+        return entry
+
+    def _proper_motions(
+        self, keys, coords, table, key_column, astrometry_table, pm_ra_col, pm_dec_col, epoch_col, coordinate_epoch
+    ):
+        # Proper motion vectors (radians/yr) and position epochs (Julian years) for the rows of _coordinates
+        import pandas as pd  # noqa: PLC0415
+
+        t = self.metadata.tables[astrometry_table]
+        if astrometry_table == table:
+            astrometry_key = key_column
+        elif astrometry_table == self._primary_table:
+            astrometry_key = self._primary_table_key
+        else:
+            astrometry_key = self._foreign_key
+        columns = [t.c[astrometry_key], t.c[pm_ra_col], t.c[pm_dec_col]]
+        if epoch_col is not None:
+            columns.append(t.c[epoch_col])
+        # Sources with several rows use the first in order of the primary key (or of the selected columns without one)
+        order = [t.c[astrometry_key]] + (list(t.primary_key.columns) or columns)
+        with self.engine.connect() as conn:
+            rows = conn.execute(select(*columns).order_by(*order)).fetchall()
+        df = pd.DataFrame(rows, columns=["key", "pm_ra", "pm_dec", "epoch"][: len(columns)])
+
+        # Rows of other tables are matched on the key, using the first one for each source
+        df = df.drop_duplicates("key").set_index("key").reindex(keys)
+        pm_ra = np.nan_to_num(pd.to_numeric(df["pm_ra"]).to_numpy(dtype=np.float64)) * _MAS_PER_YEAR
+        pm_dec = np.nan_to_num(pd.to_numeric(df["pm_dec"]).to_numpy(dtype=np.float64)) * _MAS_PER_YEAR
+        epochs = np.full(len(keys), _julian_year(coordinate_epoch))
+        if epoch_col is not None:
+            values = pd.to_numeric(df["epoch"]).to_numpy(dtype=np.float64)
+            epochs = np.where(np.isnan(values), epochs, values)
+
+        # Proper motion along the east (increasing longitude) and north directions at each position
+        lon, lat = coords.spherical.lon.rad, coords.spherical.lat.rad
+        east = np.stack([-np.sin(lon), np.cos(lon), np.zeros(len(lon))], axis=1)
+        north = np.stack([-np.sin(lat) * np.cos(lon), -np.sin(lat) * np.sin(lon), np.cos(lat)], axis=1)
+        motions = pm_ra[:, np.newaxis] * east + pm_dec[:, np.newaxis] * north
+        return motions, epochs
+
+    def create_summary_table(self, name, spec, replace=False):
+        """
+        Create a summary table with one row per source, built from a declarative specification
+        (see `astrodbkit.views.summary_selectable`), for fast catalog browsing.
+        It is stored as a materialized view indexed on the primary key and set as an attribute of this class.
+        Rows are refreshed automatically for the sources modified with `Database.add_table_data`
+        or `Database.load_json` and fully rebuilt by `Database.load_database`;
+        use `Database.refresh_summary_table` after other changes.
+        PostgreSQL always refreshes the full view, so use `Database.deferred_summary_refresh`
+        to refresh once after a series of additions.
+        Summary tables are kept in the database, but need to be registered with this method in each session.
 
-        # Join the matched sources with the desired table
-        temp = (
-            self.query(self.metadata.tables[output_table])
-            .filter(self.metadata.tables[output_table].columns[match_column].in_(matched_names))
-            .all()
+        Parameters
+        ----------
+        name : str
+            Name of the summary table
+        spec : dict
+            Summary specification, for example::
+
+                {"spectral_type": {"table": "SpectralTypes", "column": "spectral_type", "where": {"best": True}},
+                 "W1": {"table": "Photometry", "column": "magnitude", "where": {"band": "WISE_W1"}},
+                 "n_photometry": {"table": "Photometry", "aggregate": "count"}}
+        replace : bool
+            Flag to drop and rebuild an existing summary table (eg, after changing the specification). Default: False
+
+        Returns
+        -------
+        summary : SQLAlchemy TableClause
+            Table object to query the summary
+        """
+
+        selectable = summary_selectable(
+            self.metadata, spec, self._primary_table, self._primary_table_key, self._foreign_key
         )
+        summary = materialized_view(name, sqlalchemy.MetaData(), selectable, key=self._primary_table_key)
 
-        results = self._handle_format(temp, fmt)
+        # Index the stored rows on the primary key
+        preparer = self.engine.dialect.identifier_preparer
+        storage = materialized_view_storage(self.engine.dialect, name)
+        index_name = preparer.quote(f"ix_{MATERIALIZED_VIEW_PREFIX}{name}_{self._primary_table_key}")
 
-        return results
+        with self.engine.begin() as conn:
+            if replace:
+                drop_materialized_view(conn, summary)
+            create_materialized_view(conn, summary)
+            conn.execute(
+                text(
+                    f"CREATE INDEX IF NOT EXISTS {index_name} "
+                    f"ON {storage} ({preparer.quote(self._primary_table_key)})"
+                )
+            )
+
+        self._summary_tables[name] = (summary, {entry["table"] for entry in spec.values()} | {self._primary_table})
+        self.__setattr__(name, summary)
+        return summary
 
-    def search_string(self, value, fmt="table", fuzzy_search=True, verbose=True):
+    def refresh_summary_table(self, name=None, sources=None):
         """
-        Search an abitrary string across all string columns in the full database
+        Refresh summary tables created with `Database.create_summary_table`
 
         Parameters
         ----------
-        value : str
-            String to search for
-        fmt : str
-            Format to return results in (pandas, astropy/table, default). Default is astropy table
-        fuzzy_search : bool
-            Flag to perform partial searches on provided names (default: True)
-        verbose : bool
-            Output results to screen in addition to dictionary (default: True)
+        name : str
+            Name of the summary table. Default: None (all registered summary tables)
+        sources : list
+            Sources to refresh. Default: None (full refresh)
+        """
 
-        Returns
-        -------
-        Dictionary of results, with each key being the matched table names
+        names = list(self._summary_tables) if name is None else [name]
+        with self.engine.begin() as conn:
+            for summary_name in names:
+                if summary_name not in self._summary_tables:
+                    raise RuntimeError(f"Summary table {summary_name} not found. Use create_summary_table first.")
+                refresh_materialized_view(conn, self._summary_tables[summary_name][0], keys=sources)
+
+    @contextmanager
+    def deferred_summary_refresh(self):
         """
+        Context manager to refresh summary tables once at the end of the block, instead of after each
+        `Database.add_table_data` or `Database.load_json` call in it::
 
-        # Loop over all tables to build the results
-        output_dict = {}
-        for table in self.metadata.tables:
-            # Gather only string-type columns
-            columns = self.metadata.tables[table].columns
-            col_list = [
-                c
-                for c in columns
-                if isinstance(c.type, sqlalchemy_types.String)
-                or isinstance(c.type, sqlalchemy_types.Text)
-                or isinstance(c.type, sqlalchemy_types.Unicode)
-            ]
+            with db.deferred_summary_refresh():
+                for filename in filenames:
+                    db.load_json(filename)
 
-            # Construct filters to query for each string column
-            filters = []
-            for c in col_list:
-                if fuzzy_search:
-                    filters += [c.ilike(f"%{value}%")]
-                else:
-                    filters += [c.ilike(f"{value}")]
+        The sources modified in the block are refreshed together.
+        This matters most for PostgreSQL, where every refresh rebuilds the full view.
+        Only additions made by the current thread are deferred.
+        """
 
-            # Perform the actual query
-            temp = self.query(self.metadata.tables[table]).filter(or_(*filters)).distinct().all()
+        if getattr(self._thread_summary_refresh, "pending", None) is not None:
+            # Nested block: the outer one refreshes
+            yield
+            return
+
+        pending = self._thread_summary_refresh.pending = {}
+        try:
+            yield
+        finally:
+            # Data added before an error is already committed, so it is refreshed either way
+            self._thread_summary_refresh.pending = None
+            for name, sources in pending.items():
+                self.refresh_summary_table(name, sources=None if sources is None else list(sources))
+
+    def _refresh_summaries(self, names, sources=None):
+        # Refresh the given summary tables, or record them for the end of deferred_summary_refresh
+        pending = getattr(self._thread_summary_refresh, "pending", None)
+        for name in names:
+            if pending is None:
+                self.refresh_summary_table(name, sources=sources)
+            elif sources is None or (name in pending and pending[name] is None):
+                pending[name] = None
+            else:
+                pending[name] = pending.get(name, set()) | set(sources)
 
-            # Append results to dictionary output in specified format
-            if len(temp) > 0:
-                results = self._handle_format(temp, fmt)
-                if verbose:
-                    print(table)
-                    print(results)
-                output_dict[table] = results
+    def _refresh_summaries_for(self, table, sources=None):
+        # Incremental refresh of the summary tables that use the modified table
+        names = [name for name, (_, tables) in self._summary_tables.items() if table in tables]
+        self._refresh_summaries(names, sources)
 
-        return output_dict
+    def build_search_index(self, verbose=False):
+        """
+        Build an index to speed up `Database.search_string` across all string columns.
+        For SQLite, this creates a trigram full-text table (FTS5) which is searched with search_string(use_index=True).
+        For PostgreSQL, this creates trigram (pg_trgm) GIN indexes on each string column,
+        which are used by the regular search_string queries.
+        The SQLite index is not updated automatically, so rebuild it after modifying the database.
+
+        Parameters
+        ----------
+        verbose : bool
+            Flag to enable diagnostic messages
+        """
+
+        if self.engine.url.get_backend_name() == "sqlite":
+            with self.engine.begin() as conn:
+                conn.execute(text(f"DROP TABLE IF EXISTS {SEARCH_INDEX_TABLE}"))
+                conn.execute(
+                    text(
+                        f"CREATE VIRTUAL TABLE {SEARCH_INDEX_TABLE} "
+                        "USING fts5(table_name UNINDEXED, row_id UNINDEXED, value, tokenize='trigram')"
+                    )
+                )
+                for table, col_list in self._string_columns.items():
+                    if verbose:
+                        print(f"Indexing {table} table")
+                    for c in col_list:
+                        conn.execute(
+                            text(
+                                f"INSERT INTO {SEARCH_INDEX_TABLE} (table_name, row_id, value) "
+                                f'SELECT :table, rowid, "{c.name}" FROM "{table}" WHERE "{c.name}" IS NOT NULL'
+                            ),
+                            {"table": table},
+                        )
+        elif self.engine.url.get_backend_name() == "postgresql":
+            with self.engine.begin() as conn:
+                conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+                for table, col_list in self._string_columns.items():
+                    if verbose:
+                        print(f"Indexing {table} table")
+                    for c in col_list:
+                        conn.execute(
+                            text(
+                                f'CREATE INDEX IF NOT EXISTS "ix_{table}_{c.name}_trgm" '
+                                f'ON "{table}" USING gin ("{c.name}" gin_trgm_ops)'
+                            )
+                        )
+        else:
+            raise RuntimeError(f"Search index not supported for {self.engine.url.drivername} databases")
 
     # General query methods
     @deprecated_alias(format="fmt")
-    def sql_query(self, query, fmt="default"):
+    @_cached()
+    def sql_query(self, query, fmt="default", chunksize=None):
         """
         Wrapper for a direct SQL query.
 
@@ -659,21 +2444,43 @@ class Database:
             Query to be performed
         fmt : str
             Format in which to return the results (pandas, astropy/table, default)
+        chunksize : int
+            If provided, return a generator that streams the results in chunks of this many rows
+            instead of loading them all at once. Default: None
 
         Returns
         -------
-        List of SQLAlchemy results
+        List of SQLAlchemy results (or generator of them if chunksize is set)
         """
 
+        if chunksize is not None:
+            return self._sql_query_batches(query, fmt, chunksize)
+
         with self.engine.connect() as conn:
-            temp = conn.execute(text(query)).fetchall()
+            result = conn.execute(text(query))
+            temp = result.fetchall()
 
-        return self._handle_format(temp, fmt)
+        return self._handle_format(temp, fmt, column_types=self._metadata_column_types(result.keys()))
 
+    def _sql_query_batches(self, query, fmt, chunksize):
+        # Internal generator used by sql_query to stream results in chunks
+        with self.engine.connect() as conn:
+            result = conn.execution_options(yield_per=chunksize).execute(text(query))
+            column_types = self._metadata_column_types(result.keys())
+            for partition in result.partitions(chunksize):
+                yield self._handle_format(partition, fmt, column_types=column_types)
+
+    @_cached(
+        lambda self, a: {
+            a["output_table"] or self._primary_table,
+            a["coordinate_table"] or self._primary_table,
+            a["astrometry_table"] or a["coordinate_table"] or self._primary_table,
+        }
+    )
     def query_region(
         self,
         target_coords,
-        radius=Quantity(10, unit="arcsec"),
+        radius=10.0,
         output_table=None,
         fmt="table",
         coordinate_table=None,
@@ -681,6 +2488,12 @@ class Database:
         dec_col="dec",
         frame="icrs",
         unit="deg",
+        epoch=None,
+        pm_ra_col="pm_ra",
+        pm_dec_col="pm_dec",
+        epoch_col=None,
+        coordinate_epoch=2000.0,
+        astrometry_table=None,
     ):
         """
         Perform a cone search of the given coordinates and return the specified output table.
@@ -706,6 +2519,21 @@ class Database:
             Coordinate frame for objects in the database. Default: icrs
         unit : str or tuple of Unit or str
             Unit of ra/dec (or equivalent) in database. Default: deg
+        epoch : Time or float
+            Epoch of the target coordinates, as an astropy Time or a Julian year (eg, 2016.0). If given, database
+            positions are first propagated to this epoch with their proper motions. Default: None (no propagation)
+        pm_ra_col : str
+            Name of column with the proper motion in RA, including the cos(dec) factor, in mas/yr. Default: pm_ra
+        pm_dec_col : str
+            Name of column with the proper motion in Dec in mas/yr. Default: pm_dec
+        epoch_col : str
+            Name of column with the epoch of each position as a Julian year. Default: None (all at coordinate_epoch)
+        coordinate_epoch : Time or float
+            Epoch of positions without an epoch. Default: 2000.0
+        astrometry_table : str
+            Table with the proper motion and epoch columns, matched to the coordinate table on the foreign key.
+            Sources without a row there are not propagated; sources with several rows use the first one
+            in order of the table's primary key. Default: the coordinate table
 
         Returns
         -------
@@ -718,6 +2546,9 @@ class Database:
         if output_table not in self.metadata.tables:
             raise RuntimeError(f"Table {output_table} is not in the database")
 
+        import astropy.units as u  # noqa: PLC0415
+        from astropy.units.quantity import Quantity  # noqa: PLC0415
+
         # Radius conversion
         if not isinstance(radius, Quantity):
             radius = Quantity(radius, unit="arcsec")
@@ -736,21 +2567,22 @@ class Database:
         if coordinate_table == self._primary_table:
             coordinate_match_column = self._primary_table_key
 
-        # This is adapted from the original astrodbkit code
-        df = self.query(self.metadata.tables[coordinate_table]).pandas()
-        df[["ra", "dec"]] = df[[ra_col, dec_col]].apply(pd.to_numeric)  # convert everything to floats
-        mask = df["ra"].isnull()
-        df = df[~mask]
-
-        # Native use of astropy SkyCoord objects here
-        coord_list = SkyCoord(df["ra"].tolist(), df["dec"].tolist(), frame=frame, unit=unit)
-        sep_list = coord_list.separation(target_coords)  # sky separations for each db object against target position
-        good = sep_list <= radius
-
-        if sum(good) > 0:
-            matched_list = df[coordinate_match_column][good]
-        else:
-            matched_list = []
+        # Database coordinates and targets as unit vectors in the same frame. Objects are within the radius
+        # when the chord between them is short enough, which is precise even for very small separations.
+        astrometry = None
+        if epoch is not None:
+            astrometry = (astrometry_table or coordinate_table, pm_ra_col, pm_dec_col, epoch_col, coordinate_epoch)
+        coordinates = self._coordinates(
+            coordinate_table, coordinate_match_column, ra_col, dec_col, frame, unit, astrometry
+        )
+        vectors = coordinates.at_epoch(None if epoch is None else _julian_year(epoch))
+        targets = _unit_vectors(target_coords.transform_to(coordinates.frame))
+        max_chord = 2 * np.sin(min(radius.to_value(u.rad), np.pi) / 2)
+        good = np.zeros(len(vectors), dtype=bool)
+        for target in targets:
+            difference = vectors - target
+            good |= np.einsum("ij,ij->i", difference, difference) <= max_chord**2
+        matched_list = coordinates.keys[good].tolist()
 
         # Join the matched sources with the desired table
         temp = (
@@ -758,8 +2590,303 @@ class Database:
             .filter(self.metadata.tables[output_table].columns[match_column].in_(matched_list))
             .all()
         )
-        results = self._handle_format(temp, fmt)
+        results = self._handle_format(temp, fmt, column_types=self._table_column_types(output_table))
+
+        return results
+
+    @_cached(
+        lambda self, a: {
+            a["coordinate_table"] or self._primary_table,
+            a["astrometry_table"] or a["coordinate_table"] or self._primary_table,
+        }
+    )
+    def cross_match(
+        self,
+        target_coords,
+        radius=10.0,
+        fmt="table",
+        coordinate_table=None,
+        ra_col="ra",
+        dec_col="dec",
+        frame="icrs",
+        unit="deg",
+        epoch=None,
+        pm_ra_col="pm_ra",
+        pm_dec_col="pm_dec",
+        epoch_col=None,
+        coordinate_epoch=2000.0,
+        astrometry_table=None,
+    ):
+        """
+        Match many positions at once against the coordinates of a table, returning every pair within the radius.
+        Parameters are as in `query_region`, including the propagation of positions to the epoch of the targets.
+
+        Parameters
+        ----------
+        target_coords : SkyCoord
+            Astropy SkyCoord object with the positions to match
+        radius : Quantity or float
+            Match radius; floats are in arcseconds. Default: 10 arcseconds
+        fmt : str
+            Format to return results in (pandas, astropy/table, default). Default is astropy table
+        coordinate_table : str
+            Table to use for coordinates. Default: primary table (eg, Sources)
+
+        Returns
+        -------
+        Table, DataFrame, or list of tuples with the index of the target position (target), the key of the matched
+        row (eg, source), and their separation in arcseconds (separation), sorted by target and separation
+        """
+
+        import astropy.units as u  # noqa: PLC0415
+        from astropy.units.quantity import Quantity  # noqa: PLC0415
+
+        if not isinstance(radius, Quantity):
+            radius = Quantity(radius, unit="arcsec")
+        if coordinate_table is None:
+            coordinate_table = self._primary_table
+        if coordinate_table not in self.metadata.tables:
+            raise RuntimeError(f"Table {coordinate_table} is not in the database")
+        key_column = self._primary_table_key if coordinate_table == self._primary_table else self._foreign_key
+
+        astrometry = None
+        if epoch is not None:
+            astrometry = (astrometry_table or coordinate_table, pm_ra_col, pm_dec_col, epoch_col, coordinate_epoch)
+        coordinates = self._coordinates(coordinate_table, key_column, ra_col, dec_col, frame, unit, astrometry)
+        vectors = coordinates.at_epoch(None if epoch is None else _julian_year(epoch))
+        targets = _unit_vectors(target_coords.transform_to(coordinates.frame))
+        max_chord = 2 * np.sin(min(radius.to_value(u.rad), np.pi) / 2)
+
+        target_index, row_index = _cone_matches(vectors, targets, max_chord)
+        separation = _chord_to_arcsec(np.linalg.norm(vectors[row_index] - targets[target_index], axis=1))
+        order = np.lexsort((separation, target_index))
+        columns = {
+            "target": target_index[order],
+            key_column: coordinates.keys[row_index[order]],
+            "separation": separation[order],
+        }
+        return self._match_format(columns, fmt)
+
+    @_cached(
+        lambda self, a: {
+            a["coordinate_table"] or self._primary_table,
+            a["astrometry_table"] or a["coordinate_table"] or self._primary_table,
+        }
+    )
+    def nearest(
+        self,
+        target_coords,
+        k=1,
+        max_radius=None,
+        fmt="table",
+        coordinate_table=None,
+        ra_col="ra",
+        dec_col="dec",
+        frame="icrs",
+        unit="deg",
+        epoch=None,
+        pm_ra_col="pm_ra",
+        pm_dec_col="pm_dec",
+        epoch_col=None,
+        coordinate_epoch=2000.0,
+        astrometry_table=None,
+    ):
+        """
+        Find the k nearest sources to each of many positions, with a spatial tree over the coordinate table.
+        Other parameters are as in `query_region`, including the propagation of positions to the epoch of the targets.
+
+        Parameters
+        ----------
+        target_coords : SkyCoord
+            Astropy SkyCoord object with the positions to search around
+        k : int
+            Number of nearest sources to find for each position. Default: 1
+        max_radius : Quantity or float
+            Only return sources within this radius; floats are in arcseconds. Default: None (no limit)
+        fmt : str
+            Format to return results in (pandas, astropy/table, default). Default is astropy table
+        coordinate_table : str
+            Table to use for coordinates. Default: primary table (eg, Sources)
+
+        Returns
+        -------
+        Table, DataFrame, or list of tuples with the index of the target position (target), the key of the source
+        (eg, source), and their separation in arcseconds (separation), with up to k rows per target
+        sorted by separation
+        """
+
+        import astropy.units as u  # noqa: PLC0415
+        from astropy.units.quantity import Quantity  # noqa: PLC0415
+
+        if k < 1:
+            raise RuntimeError("k must be at least 1")
+        if max_radius is not None and not isinstance(max_radius, Quantity):
+            max_radius = Quantity(max_radius, unit="arcsec")
+        if coordinate_table is None:
+            coordinate_table = self._primary_table
+        if coordinate_table not in self.metadata.tables:
+            raise RuntimeError(f"Table {coordinate_table} is not in the database")
+        key_column = self._primary_table_key if coordinate_table == self._primary_table else self._foreign_key
+
+        astrometry = None
+        if epoch is not None:
+            astrometry = (astrometry_table or coordinate_table, pm_ra_col, pm_dec_col, epoch_col, coordinate_epoch)
+        coordinates = self._coordinates(coordinate_table, key_column, ra_col, dec_col, frame, unit, astrometry)
+        tree = coordinates.tree(None if epoch is None else _julian_year(epoch))
+        targets = _unit_vectors(target_coords.transform_to(coordinates.frame))
+
+        # Chord lengths between unit vectors are monotonic with the angular separation
+        max_chord = np.inf
+        if max_radius is not None:
+            # Small margin for rounding, as the tree's upper bound is strict
+            max_chord = 2 * np.sin(min(max_radius.to_value(u.rad), np.pi) / 2) * (1 + 1e-12)
+        chords, indices = tree.query(targets, k=k, distance_upper_bound=max_chord)
+        chords, indices = chords.reshape(len(targets), k), indices.reshape(len(targets), k)
+        found = indices < len(coordinates.keys)  # missing neighbours have index N
+        separation = _chord_to_arcsec(chords[found])
+        if max_radius is not None:
+            keep = separation <= max_radius.to_value(u.arcsec)
+        else:
+            keep = np.ones(len(separation), dtype=bool)
+        columns = {
+            "target": np.nonzero(found)[0][keep],
+            key_column: coordinates.keys[indices[found][keep]],
+            "separation": separation[keep],
+        }
+        return self._match_format(columns, fmt)
+
+    def spatial_join(
+        self,
+        table,
+        ra_col="ra",
+        dec_col="dec",
+        radius=10.0,
+        output_table=None,
+        fmt="table",
+        nearest_only=False,
+        frame="icrs",
+        unit="deg",
+        coordinate_table=None,
+        coordinate_ra_col="ra",
+        coordinate_dec_col="dec",
+        coordinate_frame="icrs",
+        coordinate_unit="deg",
+        chunk_size=100000,
+    ):
+        """
+        Join a catalog of positions with the rows of a database table whose coordinates are within a radius.
+        Catalog rows are matched in chunks against a spatial tree over the coordinate table, so that
+        catalogs of millions of rows can be joined without running one cone search per row.
+
+        Parameters
+        ----------
+        table : astropy.table.Table or pandas.DataFrame
+            Catalog to join. Rows without coordinates are skipped
+        ra_col, dec_col : str
+            Names of the coordinate columns of the catalog. Default: ra, dec
+        radius : Quantity or float
+            Match radius; floats are in arcseconds. Default: 10 arcseconds
+        output_table : str
+            Name of table to join with. Default: primary table (eg, Sources)
+        fmt : str
+            Format to return results in (pandas, astropy/table, default). Default is astropy table
+        nearest_only : bool
+            Flag to only keep the closest match of each catalog row. Default: False
+        frame : str
+            Coordinate frame of the catalog. Default: icrs
+        unit : str or Unit
+            Unit of the catalog coordinates, for columns without one. Default: deg
+        coordinate_table : str
+            Table to use for coordinates. Default: primary table (eg, Sources)
+        coordinate_ra_col, coordinate_dec_col, coordinate_frame, coordinate_unit
+            Columns, frame, and unit of the database coordinates, as in `query_region`. Default: ra, dec, icrs, deg
+        chunk_size : int
+            Number of catalog rows matched at a time. Default: 100000
+
+        Returns
+        -------
+        Table, DataFrame, or list of tuples with the columns of the catalog, those of the output table,
+        and the separation in arcseconds (separation), with one row per matching pair sorted by catalog row
+        and separation. Columns with the same name in several of them are suffixed with _input, _<output_table>,
+        and _match (eg, separation_match if the catalog already has a separation column).
+        """
+
+        import astropy.units as u  # noqa: PLC0415
+        import pandas as pd  # noqa: PLC0415
+        from astropy.table import Table as AstropyTable  # noqa: PLC0415
+        from astropy.table import hstack  # noqa: PLC0415
+        from astropy.units.quantity import Quantity  # noqa: PLC0415
+
+        if output_table is None:
+            output_table = self._primary_table
+        if output_table not in self.metadata.tables:
+            raise RuntimeError(f"Table {output_table} is not in the database")
+        if coordinate_table is None:
+            coordinate_table = self._primary_table
+        if coordinate_table not in self.metadata.tables:
+            raise RuntimeError(f"Table {coordinate_table} is not in the database")
+        if isinstance(table, pd.DataFrame):
+            table = AstropyTable.from_pandas(table)
+        for column in (ra_col, dec_col):
+            if column not in table.colnames:
+                raise RuntimeError(f"Column {column} is not in the catalog")
+        if not isinstance(radius, Quantity):
+            radius = Quantity(radius, unit="arcsec")
+        match_column = self._primary_table_key if output_table == self._primary_table else self._foreign_key
+        key_column = self._primary_table_key if coordinate_table == self._primary_table else self._foreign_key
+
+        coordinates = self._coordinates(
+            coordinate_table, key_column, coordinate_ra_col, coordinate_dec_col, coordinate_frame, coordinate_unit
+        )
+        max_chord = 2 * np.sin(min(radius.to_value(u.rad), np.pi) / 2)
 
+        catalog_index, row_index, separation = _catalog_matches(
+            table, ra_col, dec_col, frame, unit, coordinates, max_chord, chunk_size
+        )
+        if nearest_only:
+            _, first = np.unique(catalog_index, return_index=True)
+            catalog_index, row_index, separation = catalog_index[first], row_index[first], separation[first]
+
+        # Rows of the output table for the matched keys, fetched in batches to keep the IN clauses short
+        t = self.metadata.tables[output_table]
+        keys = pd.unique(coordinates.keys[row_index])
+        rows = []
+        for start in range(0, len(keys), 10000):
+            rows += self.query(t).filter(t.c[match_column].in_(keys[start : start + 10000].tolist())).all()
+        if rows:
+            output = self._handle_format(rows, "astropy", column_types=self._table_column_types(output_table))
+        else:
+            output = AstropyTable(names=t.columns.keys(), dtype=[object] * len(t.columns))
+
+        # A key can match several rows of the output table (eg, Photometry)
+        output_keys = np.asarray(output[match_column], dtype=object)
+        output_rows = pd.DataFrame({"key": output_keys, "row": np.arange(len(output))})
+        pairs = pd.DataFrame({"key": coordinates.keys[row_index].astype(object), "pair": np.arange(len(row_index))})
+        pairs = pairs.merge(output_rows, on="key", sort=False).sort_values(["pair", "row"], kind="stable")
+        pair, row = pairs["pair"].to_numpy(), pairs["row"].to_numpy()
+
+        results = hstack(
+            [table[catalog_index[pair]], output[row], AstropyTable({"separation": separation[pair] * u.arcsec})],
+            join_type="exact",
+            table_names=["input", output_table, "match"],
+        )
+        # hstack renames the separation column if the catalog or output table also has one
+        separation_column = "separation" if "separation" in results.colnames else "separation_match"
+        return self._match_format(results, fmt, separation_column)
+
+    @staticmethod
+    def _match_format(columns, fmt, separation="separation"):
+        # Format the results of cross_match, nearest, and spatial_join, with separations in arcseconds
+        # columns is a dictionary of arrays or an astropy Table; separation is the name of the separation column
+        import astropy.units as u  # noqa: PLC0415
+        from astropy.table import Table  # noqa: PLC0415
+
+        results = Table(columns, copy=False)
+        results[separation].unit = u.arcsec
+        if fmt.lower() == "pandas":
+            results = results.to_pandas()
+        elif fmt.lower() not in ("astropy", "table"):
+            results = list(zip(*[results[name].tolist() for name in results.colnames]))
         return results
 
     # Object output methods
@@ -787,8 +2914,9 @@ class Database:
 
         # Clean up spaces and other special characters
         filename = source_name.lower().replace(" ", "_").replace("*", "").strip() + ".json"
-        with open(os.path.join(directory, filename), "w", encoding="utf-8") as f:
-            f.write(json.dumps(data, indent=4, default=json_serializer))
+        with span("save_json", source=source_name):
+            with open(os.path.join(directory, filename), "w", encoding="utf-8") as f:
+                f.write(json_dumps(data, backend=self._json_backend))
 
     def save_reference_table(self, table: str, directory: str, reference_directory: str="reference"):
         """
@@ -808,12 +2936,12 @@ class Database:
         if not os.path.isdir(os.path.join(directory, reference_directory)):
             os.makedirs(os.path.join(directory, reference_directory))
 
-        results = self.session.query(self.metadata.tables[table]).all()
+        results = self.query(self.metadata.tables[table]).all()
         data = [row._asdict() for row in results]
         filename = table + ".json"
         if len(data) > 0:
             with open(os.path.join(directory, reference_directory, filename), "w", encoding="utf-8") as f:
-                f.write(json.dumps(data, indent=4, default=json_serializer))
+                f.write(json_dumps(data, backend=self._json_backend))
 
     def save_database(self, directory: str, clear_first: bool=True, reference_directory: str="reference", source_directory: str="source"):
         """
@@ -859,12 +2987,15 @@ class Database:
 
             self.save_reference_table(table, directory, reference_directory=reference_directory)
 
+        from tqdm import tqdm  # noqa: PLC0415
+
         # Output primary objects
         print(f"Storing individual sources to {os.path.join(directory, source_directory)}...")
         for row in tqdm(self.query(self.metadata.tables[self._primary_table])):
             self.save_json(row, os.path.join(directory, source_directory))
 
     # Object input methods
+    @_bulk_profile
     def add_table_data(self, data, table, fmt="csv"):
         """
         Method to insert data into the database. Column names in the file must match those of the database table.
@@ -886,6 +3017,8 @@ class Database:
             Data format. Default: csv
         """
 
+        import pandas as pd  # noqa: PLC0415
+
         if fmt.lower() == "csv":
             df = pd.read_csv(data)
         elif fmt.lower() == "astropy":
@@ -917,6 +3050,14 @@ class Database:
         # Load into specified table
         with self.engine.begin() as conn:
             conn.execute(self.metadata.tables[table].insert().values(fixed_data))
+        self._invalidate_cache([table])
+
+        if table == self._primary_table:
+            self._refresh_summaries_for(table, df[self._primary_table_key].to_list())
+        elif self._foreign_key in df.columns:
+            self._refresh_summaries_for(table, df[self._foreign_key].to_list())
+        else:
+            self._refresh_summaries_for(table)
 
     def load_table(self, table, directory, verbose=False):
         """
@@ -932,17 +3073,22 @@ class Database:
             Flag to enable diagnostic messages
         """
 
+        with self.engine.begin() as conn:
+            self._load_table(conn, table, directory, verbose=verbose)
+        self._invalidate_cache([table])
+
+    def _load_table(self, conn, table, directory, verbose=False):
+        # Insert the contents of [table].json with the given connection, see load_table
         filename = os.path.join(directory, table + ".json")
         if os.path.exists(filename):
-            with open(filename, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                with self.engine.begin() as conn:
-                    conn.execute(self.metadata.tables[table].insert().values(data))
+            with open(filename, "rb") as f:
+                data = self._decode_temporal(table, json_loads(f.read(), backend=self._json_backend))
+            conn.execute(self.metadata.tables[table].insert().values(data))
         else:
             if verbose:
                 print(f"{table}.json not found.")
 
-    def load_json(self, filename):
+    def load_json(self, filename, refresh_summaries=True):
         """
         Load single source JSON into the database
 
@@ -950,50 +3096,138 @@ class Database:
         ----------
         filename : str
             Name of directory containing the JSON file
+        refresh_summaries : bool
+            Flag to refresh the source in the summary tables (see `Database.deferred_summary_refresh`
+            to refresh once after loading several files). Default: True
         """
 
-        with open(filename, "r", encoding="utf-8") as f:
-            data = json.load(f, object_hook=datetime_json_parser)
-
-        # Loop through the dictionary, adding data to the database.
-        # Ensure that Sources is added first
-        source = data[self._primary_table][0][self._primary_table_key]
+        data = self._read_json(filename)
         with self.engine.begin() as conn:
-            conn.execute(self.metadata.tables[self._primary_table].insert().values(data[self._primary_table]))
-            for key, value in data.items():
-                if key == self._primary_table:
-                    continue
+            sources = self._insert_sources(conn, [data])
+        self._invalidate_cache(data.keys())
+
+        if refresh_summaries and len(self._summary_tables) > 0:
+            self._refresh_summaries(list(self._summary_tables), sources)
+
+    def _read_json(self, filename):
+        # Parse a source JSON file; only the date/time columns of each table are converted from strings
+        with open(filename, "rb") as f:
+            data = json_loads(f.read(), backend=self._json_backend)
+        for key, value in data.items():
+            if key in self.metadata.tables:
+                self._decode_temporal(key, value)
+        return data
+
+    def _insert_sources(self, conn, sources):
+        """
+        Insert the data of several sources, as read by `_read_json`, with one pass per table
 
-                # Loop over multiple values (eg, Photometry)
-                for v in value:
-                    temp_dict = v
-                    temp_dict[self._foreign_key] = source
-                    conn.execute(self.metadata.tables[key].insert().values(temp_dict))
+        Parameters
+        ----------
+        conn : SQLAlchemy Connection
+            Connection to insert with, within a transaction
+        sources : list
+            List of dictionaries of table name: list of rows for each source
+
+        Returns
+        -------
+        names : list
+            Names of the inserted sources
+        """
 
-    def load_database(self, directory: str, verbose: bool=False, reference_directory: str="reference", source_directory: str="source"):
+        names = []
+        rows = defaultdict(list)
+        for data in sources:
+            source = data[self._primary_table][0][self._primary_table_key]
+            names.append(source)
+            for key, value in data.items():
+                # Loop over multiple values (eg, Photometry)
+                if key != self._primary_table:
+                    for v in value:
+                        v[self._foreign_key] = source
+                rows[key].extend(value)
+
+        # Ensure that Sources is added first, then other tables in foreign key order
+        order = {table.name: i for i, table in enumerate(self.metadata.sorted_tables)}
+        for key in sorted(rows, key=lambda k: (k != self._primary_table, order.get(k, len(order)))):
+            # Rows are inserted together when they have the same columns
+            groups = defaultdict(list)
+            for row in rows[key]:
+                groups[tuple(row)].append(row)
+            for group in groups.values():
+                conn.execute(self.metadata.tables[key].insert(), group)
+        return names
+
+    @_bulk_profile
+    def load_database(
+        self,
+        directory: str,
+        verbose: bool = False,
+        reference_directory: str = "reference",
+        source_directory: str = "source",
+        max_workers: int = 4,
+        batch_size: int = 100,
+        single_transaction: bool = False,
+        rebuild_indexes: bool = False,
+    ):
         """
         Reload entire database from a directory of JSON files.
         Note that this will first clear existing tables.
+        Source files are read and parsed by a pool of threads while they are inserted in batches.
 
         Parameters
         ----------
         directory : str
             Name of top-level directory containing the JSON files
         verbose : bool
-            Flag to enable diagnostic messages
+            Flag to enable diagnostic messages, including the number of source files loaded per second
         reference_directory : str
             Relative path to sub-directory to use for reference JSON files (eg, data/reference)
         source_directory : str
             Relative path to sub-directory to use for source JSON files (eg, data/source)
+        max_workers : int
+            Number of threads reading source files. Default: 4
+        batch_size : int
+            Number of source files inserted per transaction. Default: 100
+        single_transaction : bool
+            Flag to load everything in one transaction, checking foreign keys once at the end instead of on every
+            row (see `check_foreign_keys`). If any are violated, the database is left unchanged and RuntimeError is
+            raised with a report of the violations. On PostgreSQL, only foreign keys created as DEFERRABLE are
+            deferred; the others are still checked on every row. Default: False
+        rebuild_indexes : bool
+            Flag to drop non-unique indexes while loading and create them again at the end.
+            Only used with single_transaction. Default: False
         """
 
+        if rebuild_indexes and not single_transaction:
+            raise RuntimeError("rebuild_indexes requires single_transaction=True")
+        context = self._single_transaction(rebuild_indexes, verbose) if single_transaction else nullcontext()
+        with context as bulk_conn:
+            self._load_database(
+                bulk_conn, directory, verbose, reference_directory, source_directory, max_workers, batch_size
+            )
+        self._invalidate_cache()
+
+        if len(self._summary_tables) > 0:
+            if verbose:
+                print("Refreshing summary tables")
+            self.refresh_summary_table()
+
+    def _load_database(
+        self, bulk_conn, directory, verbose, reference_directory, source_directory, max_workers, batch_size
+    ):
+        # Body of load_database; everything uses bulk_conn if given, otherwise a transaction per step
+        def transaction():
+            return nullcontext(bulk_conn) if bulk_conn is not None else self.engine.begin()
+
         # Clear existing database contents
         # reversed(sorted_tables) can help ensure that foreign key dependencies are taken care of first
         for table in reversed(self.metadata.sorted_tables):
             if verbose:
                 print(f"Deleting {table.name} table")
-            with self.engine.begin() as conn:
+            with transaction() as conn:
                 conn.execute(self.metadata.tables[table.name].delete())
+        self._invalidate_cache()
 
         # Load reference tables first
         for table in self._lookup_tables:
@@ -1001,9 +3235,11 @@ class Database:
                 print(f"Loading {table} table")
             # Check if the reference table is in the sub-directory
             if os.path.exists(os.path.join(directory, reference_directory, table+".json")):
-                self.load_table(table, os.path.join(directory, reference_directory), verbose=verbose)
+                table_directory = os.path.join(directory, reference_directory)
             else:
-                self.load_table(table, directory, verbose=verbose)
+                table_directory = directory
+            with transaction() as conn:
+                self._load_table(conn, table, table_directory, verbose=verbose)
 
         # Load object data
         if verbose:
@@ -1015,22 +3251,160 @@ class Database:
         else:
             directory_of_sources = directory
 
-        # Scan selected directory for JSON source files
-        for file in tqdm(os.listdir(directory_of_sources)):
-            # Skip reference tables
-            core_name = file.replace(".json", "")
-            if core_name in self._lookup_tables:
-                continue
+        from tqdm import tqdm  # noqa: PLC0415
+
+        # Scan selected directory for JSON source files,
+        # skipping reference tables, hidden files, and non-JSON files
+        with os.scandir(directory_of_sources) as entries:
+            files = sorted(
+                entry.path
+                for entry in entries
+                if entry.name.endswith(".json")
+                and not entry.name.startswith(".")
+                and entry.name[: -len(".json")] not in self._lookup_tables
+                and entry.is_file()
+            )
 
-            # Skip non-JSON files or hidden files
-            if not file.endswith(".json") or file.startswith("."):
-                continue
+        # Reader threads parse files ahead of the inserts, which are done in batches on this thread
+        start = time.perf_counter()
+        with tqdm(total=len(files), unit="files") as progress:
+            batch = []
+            for data in _prefetch(self._read_json, files, max_workers=max_workers, queue_size=2 * batch_size):
+                batch.append(data)
+                if len(batch) == batch_size:
+                    with transaction() as conn:
+                        self._insert_sources(conn, batch)
+                    progress.update(len(batch))
+                    batch = []
+            if len(batch) > 0:
+                with transaction() as conn:
+                    self._insert_sources(conn, batch)
+                progress.update(len(batch))
+        if verbose:
+            elapsed = time.perf_counter() - start
+            rate = len(files) / elapsed if elapsed > 0 else 0
+            print(f"Loaded {len(files)} source files in {elapsed:.2f} s ({rate:.0f} files/s)")
+
+    def save_archive(
+        self, filename: str, compression: str = "deflated", batch_size: int = 10000, verbose: bool = False
+    ):
+        """
+        Output contents of the database into a single archive file, an alternative to `save_database`
+        that avoids writing one file per source. The archive is a zip file with one JSON Lines file per table
+        (one row per line); rows are streamed from the database in batches.
+        Use `load_archive` to load it; loading an archive and calling `save_database` gives the same JSON files
+        as calling `save_database` on the original database.
+
+        Parameters
+        ----------
+        filename : str
+            Name of the archive file to write. It is replaced only once the archive is complete.
+        compression : str
+            Compression of the files in the archive: stored (none), deflated, bzip2, or lzma. Default: deflated
+        batch_size : int
+            Number of rows read and written at a time. Default: 10000
+        verbose : bool
+            Flag to enable diagnostic messages
+        """
+
+        if compression not in ARCHIVE_COMPRESSION:
+            raise RuntimeError(f"Compression {compression} not recognized; use one of {list(ARCHIVE_COMPRESSION)}")
+
+        manifest = {"format": ARCHIVE_FORMAT, "version": ARCHIVE_VERSION, "tables": {}}
+        temp_filename = f"{filename}.{os.getpid()}.tmp"
+        try:
+            with zipfile.ZipFile(temp_filename, "w", compression=ARCHIVE_COMPRESSION[compression]) as archive:
+                with self.engine.connect() as conn:
+                    for table in self.metadata.sorted_tables:
+                        count = 0
+                        keys = [str(column.name) for column in table.columns]
+                        # Rows are kept in the database's order, which save_reference_table also uses
+                        result = conn.execution_options(yield_per=batch_size).execute(table.select())
+                        with archive.open(table.name + ".jsonl", "w", force_zip64=True) as f:
+                            for partition in result.partitions():
+                                rows = [dict(zip(keys, row)) for row in partition]
+                                f.write(json_lines(rows, backend=self._json_backend))
+                                count += len(rows)
+                        manifest["tables"][table.name] = count
+                        if verbose:
+                            print(f"{table.name}: {count} rows")
+                archive.writestr(ARCHIVE_MANIFEST, json.dumps(manifest, indent=4))
+            os.replace(temp_filename, filename)
+        finally:
+            if os.path.exists(temp_filename):
+                os.remove(temp_filename)
+
+    @_bulk_profile
+    def load_archive(self, filename: str, batch_size: int = 10000, verbose: bool = False):
+        """
+        Reload entire database from an archive file written by `save_archive`.
+        Note that this will first clear existing tables; tables missing from the archive are left empty.
+        Everything is loaded in a single transaction, so the database is unchanged if loading fails.
+
+        Parameters
+        ----------
+        filename : str
+            Name of the archive file
+        batch_size : int
+            Number of rows parsed and inserted at a time. Default: 10000
+        verbose : bool
+            Flag to enable diagnostic messages
+        """
+
+        with zipfile.ZipFile(filename) as archive:
+            try:
+                manifest = json.loads(archive.read(ARCHIVE_MANIFEST))
+            except KeyError as e:
+                raise RuntimeError(f"{filename} is not an AstrodbKit archive") from e
+            if manifest.get("format") != ARCHIVE_FORMAT or manifest.get("version", 0) > ARCHIVE_VERSION:
+                raise RuntimeError(f"{filename} is not an AstrodbKit archive this version can read")
+            unknown = [table for table in manifest["tables"] if table not in self.metadata.tables]
+            if len(unknown) > 0:
+                raise RuntimeError(f"Tables in the archive but not in the database: {unknown}")
+
+            with self.engine.begin() as conn:
+                for table in reversed(self.metadata.sorted_tables):
+                    conn.execute(table.delete())
+
+                # Sorted tables are in foreign key order, so referenced rows are inserted first
+                for table in self.metadata.sorted_tables:
+                    if table.name not in manifest["tables"]:
+                        continue
+                    if verbose:
+                        print(f"Loading {table.name} table")
+                    count = 0
+                    with archive.open(table.name + ".jsonl") as f:
+                        while lines := list(itertools.islice(f, batch_size)):
+                            # Parse the batch as one JSON array
+                            rows = json_loads(b"[" + b",".join(lines) + b"]", backend=self._json_backend)
+                            conn.execute(table.insert(), self._decode_temporal(table.name, rows))
+                            count += len(rows)
+                    if count != manifest["tables"][table.name]:
+                        raise RuntimeError(
+                            f"{table.name} has {count} rows in {filename}, expected {manifest['tables'][table.name]}"
+                        )
+        self._invalidate_cache()
+
+        if len(self._summary_tables) > 0:
+            if verbose:
+                print("Refreshing summary tables")
+            self.refresh_summary_table()
+
+    def close(self):
+        """
+        Close the session and all pooled connections of this database.
+        For in_memory databases, this also discards the in-memory copy.
+        The Database cannot be used afterwards.
+        """
 
-            self.load_json(os.path.join(directory_of_sources, file))
+        self.session.close()
+        self.engine.dispose()
+        if self._memory_connection is not None:
+            self._memory_connection.close()
 
     def dump_sqlite(self, database_name):
         """Output database as a sqlite file"""
-        if self.engine.url.drivername == "sqlite":
+        if self.engine.url.get_backend_name() == "sqlite":
             destconn = sqlite3.connect(database_name)
             self.engine.raw_connection().backup(destconn)
         else:
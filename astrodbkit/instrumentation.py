@@ -0,0 +1,232 @@
+"""Timing hooks to see where time goes in AstrodbKit operations
+
+Instrumented stages are reported to callbacks registered with `add_hook`, for example to forward them
+to a metrics or tracing system, or collected and printed with the `profile` context manager.
+SQL execution is only timed for the databases given when registering a callback.
+With no callbacks registered, instrumentation does nothing beyond checking for them.
+"""
+
+__all__ = ["add_hook", "remove_hook", "span", "instrumented", "profile", "Profile"]
+
+import functools
+import threading
+import time
+import warnings
+from collections import defaultdict
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+# Registered callbacks, called as callback(stage, elapsed, attributes)
+_hooks = []
+# (callback, engine or None) for each add_hook call, to undo them in remove_hook
+_registrations = []
+# Engines with SQL timing: engine -> (callbacks, before_cursor_execute listener, after_cursor_execute listener)
+_sql_engines = {}
+_lock = threading.Lock()
+_sql_start = threading.local()
+
+
+class _NullSpan:
+    """Span used when instrumentation is disabled"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def set_attribute(self, key, value):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    """Timer for one stage; reports to the registered callbacks when finished"""
+
+    def __init__(self, stage, attributes):
+        self.stage = stage
+        self.attributes = attributes
+        self.start = None
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        _emit(self.stage, time.perf_counter() - self.start, self.attributes)
+        return False
+
+    def set_attribute(self, key, value):
+        """Attach information to the span, like the number of rows processed"""
+        self.attributes[key] = value
+
+
+def _emit(stage, elapsed, attributes, hooks=None):
+    # Errors in callbacks are reported as warnings rather than interrupting the instrumented code
+    for hook in list(_hooks if hooks is None else hooks):
+        try:
+            hook(stage, elapsed, attributes)
+        except Exception as e:  # pylint: disable=broad-except
+            warnings.warn(f"Instrumentation hook {hook!r} failed: {e!r}", RuntimeWarning)
+
+
+def span(stage, **attributes):
+    """
+    Time a block of code as an instrumentation stage::
+
+        with span("format", rows=len(rows)) as s:
+            ...
+            s.set_attribute("columns", 5)
+
+    Parameters
+    ----------
+    stage : str
+        Name of the stage
+    attributes
+        Additional information passed to the callbacks
+
+    Returns
+    -------
+    Context manager; a shared no-op one when no callbacks are registered
+    """
+    if not _hooks:
+        return _NULL_SPAN
+    return _Span(stage, attributes)
+
+
+def instrumented(stage):
+    """Decorator to time every call of a function as an instrumentation stage"""
+
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not _hooks:
+                return function(*args, **kwargs)
+            with _Span(stage, {}):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def _sql_listeners(callbacks):
+    # Cursor execution listeners reporting the "sql" stage to the callbacks of one engine
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        _sql_start.time = time.perf_counter()
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        start = getattr(_sql_start, "time", None)
+        if start is not None:
+            attributes = {"statement": statement, "executemany": executemany}
+            _emit("sql", time.perf_counter() - start, attributes, hooks=callbacks)
+
+    return before_cursor_execute, after_cursor_execute
+
+
+def _sql_engine(database):
+    # SQLAlchemy Engine of a Database, AsyncDatabase, Engine, or AsyncEngine
+    engine = getattr(database, "engine", database)
+    return getattr(engine, "sync_engine", engine)
+
+
+def add_hook(callback, database=None):
+    """
+    Register a callback for instrumentation events.
+
+    Parameters
+    ----------
+    callback : callable
+        Function called as callback(stage, elapsed, attributes) when a stage finishes, with the elapsed time
+        in seconds and a dictionary of additional information (eg, rows or statement)
+    database : Database, AsyncDatabase, or SQLAlchemy Engine
+        Database whose SQL execution is also timed for this callback (stage "sql"), while it is registered.
+        Other engines in the process are not affected. Default: None (no SQL timing)
+    """
+    engine = None if database is None else _sql_engine(database)
+    with _lock:
+        _hooks.append(callback)
+        _registrations.append((callback, engine))
+        if engine is None:
+            return
+        if engine not in _sql_engines:
+            callbacks = []
+            before, after = _sql_listeners(callbacks)
+            event.listen(engine, "before_cursor_execute", before)
+            event.listen(engine, "after_cursor_execute", after)
+            _sql_engines[engine] = (callbacks, before, after)
+        _sql_engines[engine][0].append(callback)
+
+
+def remove_hook(callback):
+    """Unregister a callback added with `add_hook`, and stop timing SQL for its database if no other callback uses it"""
+    with _lock:
+        registration = next(r for r in reversed(_registrations) if r[0] is callback)
+        _registrations.remove(registration)
+        _hooks.remove(callback)
+        engine = registration[1]
+        if engine is None:
+            return
+        callbacks, before, after = _sql_engines[engine]
+        callbacks.remove(callback)
+        if not callbacks:
+            event.remove(engine, "before_cursor_execute", before)
+            event.remove(engine, "after_cursor_execute", after)
+            del _sql_engines[engine]
+
+
+class Profile:
+    """Totals of calls, time, and rows per instrumentation stage, collected by `profile`"""
+
+    def __init__(self):
+        self.stages = defaultdict(lambda: {"calls": 0, "time": 0.0, "rows": 0})
+        self._lock = threading.Lock()
+
+    def __call__(self, stage, elapsed, attributes):
+        with self._lock:
+            totals = self.stages[stage]
+            totals["calls"] += 1
+            totals["time"] += elapsed
+            totals["rows"] += attributes.get("rows", 0)
+
+    def report(self):
+        """Breakdown of the collected stages as a string, slowest first"""
+        lines = [f"{'stage':<16}{'calls':>8}{'time (s)':>12}{'rows':>10}"]
+        for stage, totals in sorted(self.stages.items(), key=lambda item: -item[1]["time"]):
+            lines.append(f"{stage:<16}{totals['calls']:>8}{totals['time']:>12.4f}{totals['rows']:>10}")
+        return "\n".join(lines)
+
+
+@contextmanager
+def profile(database=None, verbose=True):
+    """
+    Collect the instrumentation stages of the enclosed code and print a breakdown at the end::
+
+        with profile(db) as p:
+            db.query_region(coords)
+        p.stages["sql"]["calls"]
+
+    Stages can be nested (eg, astropy within format), so their times are not additive.
+
+    Parameters
+    ----------
+    database : Database, AsyncDatabase, or SQLAlchemy Engine
+        Database whose SQL execution is also timed (stage "sql"). Default: None (no SQL timing)
+    verbose : bool
+        Flag to print the breakdown when the block finishes. Default: True
+
+    Returns
+    -------
+    Profile with the collected stages
+    """
+    collector = Profile()
+    add_hook(collector, database)
+    try:
+        yield collector
+    finally:
+        remove_hook(collector)
+        if verbose:
+            print(collector.report())
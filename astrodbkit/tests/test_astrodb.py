@@ -1,22 +1,44 @@
 # Testing for astrodb
 
+import datetime
 import io
 import json
 import os
 import shutil
+import sqlite3
+import subprocess
+import sys
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
 
+import numpy as np
 import pandas as pd
 import pytest
 import sqlalchemy as sa
+from astropy import units as u
 from astropy.coordinates import SkyCoord
 from astropy.io import ascii
-from astropy.table import Table
+from astropy.table import MaskedColumn, Table
+from astropy.time import Time
 from astropy.units.quantity import Quantity
-from sqlalchemy.exc import IntegrityError
-
-from astrodbkit.astrodb import Database, copy_database_schema, create_database
+from sqlalchemy.exc import IntegrityError, OperationalError
+
+from astrodbkit.astrodb import (
+    Database,
+    _foreign_key_levels,
+    _immediate_foreign_keys,
+    _prefetch,
+    copy_database_schema,
+    create_database,
+)
 from astrodbkit.schema_example import *
-from astrodbkit.views import view
+from astrodbkit.views import (
+    MATERIALIZED_VIEW_PREFIX,
+    drop_materialized_view,
+    materialized_view,
+    refresh_materialized_view,
+    view,
+)
 
 try:
     import mock
@@ -27,6 +49,16 @@ except ImportError:
 DB_PATH = 'temp.db'
 
 
+def test_lazy_imports():
+    # Guard import time: importing the database module should not load the heavy dependencies
+    code = (
+        "import sys; import astrodbkit.astrodb; "
+        "print(sorted(m for m in ('pandas', 'astropy', 'specutils', 'astroquery', 'yaml', 'tqdm') if m in sys.modules))"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "[]"
+
+
 def test_nodatabase():
     connection_string = 'sqlite:///:memory:'
     with pytest.raises(RuntimeError, match='Create database'):
@@ -170,6 +202,203 @@ def test_orm_use(db):
         _ = Sources(source="V4046 Sgr", ra=273.54, dec=-9999, reference="Schm10")
     
 
+def test_sessions(db):
+    # Short-lived sessions commit on exit and roll back on errors
+    with db.session_scope() as session:
+        session.add(Sources(source="V4046 Sgr", ra=273.54, dec=-32.79, reference="Schm10"))
+    assert db.query(db.Sources).filter(db.Sources.c.source == "V4046 Sgr").count() == 1
+
+    with pytest.raises(IntegrityError):
+        with db.session_scope() as session:
+            session.execute(db.Sources.delete().where(db.Sources.c.source == "V4046 Sgr"))
+            session.add(Sources(source="Bad reference", ra=1., dec=1., reference="Not a reference"))
+    assert db.query(db.Sources).filter(db.Sources.c.source == "V4046 Sgr").count() == 1
+
+    with db.session_scope() as session:
+        session.execute(db.Sources.delete().where(db.Sources.c.source == "V4046 Sgr"))
+    assert db.query(db.Sources).filter(db.Sources.c.source == "V4046 Sgr").count() == 0
+
+    # Each thread gets its own session, the main thread keeps db.session
+    assert db.scoped_session() is db.session
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        thread_sessions = list(executor.map(lambda _: id(db.scoped_session()), range(4)))
+        counts = list(executor.map(lambda _: len(db.search_object('1357', verbose=False)), range(8)))
+    assert id(db.session) not in thread_sessions
+    assert counts == [1] * 8
+
+
+def test_pool_arguments():
+    # Pool settings are passed to the engine, in-memory databases share a single connection
+    db = Database('sqlite:///' + DB_PATH, pool_arguments={"pool_size": 3, "pool_pre_ping": True})
+    assert db.engine.pool.size() == 3
+    db.engine.dispose()
+
+    db = Database('sqlite://')
+    assert isinstance(db.engine.pool, sa.pool.StaticPool)
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        assert list(executor.map(lambda _: db.query(db.Sources).count(), range(2))) == [0, 0]
+
+
+def test_reflection_cache(db, tmp_path):
+    # The reflected schema is cached and reused until the database schema changes
+    cache_file = str(tmp_path / 'schema.pickle')
+    connection_string = 'sqlite:///' + DB_PATH
+    db2 = Database(connection_string, reflection_cache=cache_file)
+    assert os.path.exists(cache_file)
+    db2.engine.dispose()
+
+    with mock.patch.object(sa.MetaData, 'reflect') as mock_reflect:
+        db2 = Database(connection_string, reflection_cache=cache_file)
+        assert not mock_reflect.called
+    assert db2.query(db2.Sources).count() == db.query(db.Sources).count()
+    assert 'source' in [c.name for c in db2.Photometry.columns]
+    db2.engine.dispose()
+
+    # Changing the schema invalidates the cache
+    with db.engine.begin() as conn:
+        conn.execute(sa.text('CREATE TABLE "CacheTest" (id INTEGER PRIMARY KEY)'))
+    db2 = Database(connection_string, reflection_cache=cache_file)
+    assert 'CacheTest' in db2.metadata.tables
+    db2.engine.dispose()
+    with db.engine.begin() as conn:
+        conn.execute(sa.text('DROP TABLE "CacheTest"'))
+
+    # An unreadable cache file is replaced
+    with open(cache_file, 'wb') as f:
+        f.write(b'not a pickle')
+    db2 = Database(connection_string, reflection_cache=cache_file)
+    assert 'CacheTest' not in db2.metadata.tables
+    db2.engine.dispose()
+
+
+def test_in_memory(db):
+    # Work on a read-only in-memory copy of the database
+    db2 = Database('sqlite:///' + DB_PATH, in_memory=True, read_only=True)
+    assert db2.engine.url.database != DB_PATH
+    assert db2.query(db2.Sources).count() == db.query(db.Sources).count()
+    with pytest.raises(OperationalError, match='readonly'):
+        with db2.engine.begin() as conn:
+            conn.execute(db2.Sources.delete())
+
+    # Connections from other threads see the same in-memory copy
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        counts = list(executor.map(lambda _: db2.query(db2.Sources).count(), range(4)))
+    assert counts == [db.query(db.Sources).count()] * 4
+    assert len(db2.search_string('fake', max_workers=2, verbose=False)['Sources']) == 1
+
+    # Closing discards the in-memory copy
+    memory_connection = db2._memory_connection
+    db2.close()
+    with pytest.raises(sqlite3.ProgrammingError, match='closed'):
+        memory_connection.execute('SELECT 1')
+
+    # Writable copies do not modify the file
+    db2 = Database('sqlite:///' + DB_PATH, in_memory=True)
+    with db2.engine.begin() as conn:
+        conn.execute(db2.Names.delete())
+    assert db2.query(db2.Names).count() == 0
+    assert db.query(db.Names).count() > 0
+    db2.close()
+
+    with pytest.raises(RuntimeError, match='file-based SQLite'):
+        _ = Database('sqlite://', in_memory=True)
+    with pytest.raises(RuntimeError, match='not found'):
+        _ = Database('sqlite:///not_a_file.db', in_memory=True)
+
+
+def test_sqlite_profile(db, tmp_path):
+    # Work on a copy as the read profile switches the file to WAL mode
+    db_copy = str(tmp_path / 'profile.db')
+    db.dump_sqlite(db_copy)
+    db2 = Database('sqlite:///' + db_copy, sqlite_profile='read')
+
+    def pragma(name):
+        with db2.engine.connect() as conn:
+            return conn.execute(sa.text(f'PRAGMA {name}')).scalar()
+
+    assert pragma('journal_mode') == 'wal'
+    assert pragma('synchronous') == 1  # NORMAL
+    assert pragma('foreign_keys') == 1
+    with db2.sqlite_profile('bulk'):
+        assert pragma('synchronous') == 0  # OFF
+        assert pragma('cache_size') == -256000
+
+        # Other threads keep the database's profile meanwhile
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            assert executor.submit(pragma, 'synchronous').result() == 1
+        assert pragma('synchronous') == 0
+    assert pragma('synchronous') == 1
+    assert pragma('cache_size') == -64000
+
+    # Bulk profile is used automatically while adding data
+    with mock.patch('astrodbkit.astrodb._apply_sqlite_pragmas') as mock_pragmas:
+        data = pd.DataFrame([{'source': 'FAKE', 'other_name': 'Another penguin'}])
+        db2.add_table_data(data, 'Names', fmt='pandas')
+    assert mock_pragmas.call_args_list[0].args[1]['synchronous'] == 'OFF'
+    assert db2._sqlite_profile == 'read'
+
+    with pytest.raises(RuntimeError, match='Unrecognized SQLite profile'):
+        with db2.sqlite_profile('fast'):
+            pass
+    db2.engine.dispose()
+
+    # Foreign keys are only enabled for astrodbkit engines
+    engine = sa.create_engine('sqlite://')
+    with engine.connect() as conn:
+        assert conn.execute(sa.text('PRAGMA foreign_keys')).scalar() == 0
+
+
+def test_indexes(db, tmp_path):
+    # Work on a copy to keep the original schema
+    db_copy = str(tmp_path / 'indexes.db')
+    db.dump_sqlite(db_copy)
+    db2 = Database('sqlite:///' + db_copy)
+
+    missing = db2.missing_indexes()
+    assert ('Sources', 'ra') in missing
+    assert ('Photometry', 'reference') in missing
+    assert ('Names', 'source') not in missing  # covered by the primary key
+
+    created = db2.create_indexes()
+    assert created == missing
+    assert len(db2.missing_indexes()) == 0
+    assert len(db2.create_indexes()) == 0
+    db2.engine.dispose()
+
+    # Indexes are found after reflection
+    db2 = Database('sqlite:///' + db_copy)
+    assert len(db2.missing_indexes()) == 0
+    assert 'ix_Sources_ra' in [index.name for index in db2.Sources.indexes]
+    db2.engine.dispose()
+
+    # New databases can be created with the indexes
+    connection_string = 'sqlite:///' + str(tmp_path / 'new_indexes.db')
+    create_database(connection_string, create_indexes=True)
+    db3 = Database(connection_string)
+    assert len(db3.missing_indexes()) == 0
+    db3.engine.dispose()
+
+
+def test_thread_connections(db):
+    # Reads from other threads return their connection to the pool, so more threads than connections can run
+    db = Database('sqlite:///' + DB_PATH, pool_arguments={"pool_size": 2, "max_overflow": 1, "pool_timeout": 2})
+
+    def read(_):
+        n_sources = len(db.query(db.Sources).all())
+        assert len(db.search_object('1357', verbose=False)) == 1
+        assert sum(len(t) for t in db.query(db.Sources).iter_batches(size=1)) == n_sources
+        session = db.scoped_session()
+        assert session.scalar(sa.select(sa.func.count()).select_from(db.Sources)) == n_sources
+        assert len(session.scalars(sa.select(db.Sources.c.source)).all()) == n_sources
+        return n_sources
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        counts = list(executor.map(read, range(16)))
+    assert len(set(counts)) == 1
+    assert db.engine.pool.checkedout() == 0
+    db.engine.dispose()
+
+
 def test_add_table_data(db):
     # Test the add_table_data method
     file = io.StringIO("""source,band,magnitude,telescope,reference
@@ -257,6 +486,26 @@ def test_search_string(db):
     d = db.search_string('2mass', fuzzy_search=False)
     assert len(d) == 0
 
+    # Search tables concurrently
+    d = db.search_string('2mass', max_workers=4)
+    assert list(d.keys()) == list(db.search_string('2mass').keys())
+
+    # Search using the full-text index
+    with pytest.raises(RuntimeError, match='build_search_index'):
+        db.search_string('fake', use_index=True)
+    db.build_search_index()
+    d = db.search_string('fake', use_index=True)
+    assert d['Sources']['source'] == 'FAKE'
+    d = db.search_string('2mass', use_index=True, fmt='pandas')
+    assert set(d.keys()) == set(db.search_string('2mass').keys())
+    assert len(db.search_string('2mass', fuzzy_search=False, use_index=True)) == 0
+    assert len(db.search_string('penguin', fuzzy_search=False, use_index=True)['Names']) == 1
+
+    # Index tables are not reflected as part of the database
+    db2 = Database(db.engine.url.render_as_string())
+    assert all(not table.startswith('astrodbkit') for table in db2.metadata.tables)
+    db2.engine.dispose()
+
 
 def test_query_region(db):
     t = db.query_region(SkyCoord(0, 0, frame='icrs', unit='deg'))
@@ -288,6 +537,182 @@ def test_query_region(db):
         t = db.query_region(SkyCoord(209, 14, frame='icrs', unit='deg'), coordinate_table='NOTABLE')
 
 
+def test_coordinate_cache(db):
+    # Coordinates are cached between cone searches and invalidated by writes through the engine
+    cached_db = Database('sqlite:///' + DB_PATH, coordinate_cache=True)
+    target = SkyCoord(209.301675, 14.477722, frame='icrs', unit='deg')
+    assert len(cached_db.query_region(target)) == 1
+    assert len(cached_db._coordinate_cache) == 1
+
+    # Targets in other frames and several targets at once
+    assert len(cached_db.query_region(target.galactic)) == 1
+    targets = SkyCoord([209.301675, 0], [14.477722, 0], frame='icrs', unit='deg')
+    assert len(cached_db.query_region(targets, radius=Quantity(1, unit='arcmin'))) == 1
+
+    new_source = {'source': 'Cache Test', 'ra': 209.3017, 'dec': 14.4777, 'reference': 'Schm10'}
+    with cached_db.engine.begin() as conn:
+        conn.execute(cached_db.Sources.insert().values(new_source))
+    assert len(cached_db._coordinate_cache) == 0
+    assert set(cached_db.query_region(target)['source']) == {'2MASS J13571237+1428398', 'Cache Test'}
+    with cached_db.engine.begin() as conn:
+        conn.execute(sa.text("DELETE FROM Sources WHERE source = 'Cache Test'"))
+    assert len(cached_db._coordinate_cache) == 0
+    assert len(cached_db.query_region(target)) == 1
+
+    # Writes from another Database are only seen after clearing the cache
+    with db.engine.begin() as conn:
+        conn.execute(db.Sources.insert().values(new_source))
+    assert len(cached_db.query_region(target)) == 1
+    cached_db.cache_clear()
+    assert len(cached_db.query_region(target)) == 2
+    with db.engine.begin() as conn:
+        conn.execute(db.Sources.delete().where(db.Sources.c.source == 'Cache Test'))
+
+    # Coordinates read while the cache is invalidated are returned but not stored
+    cached_db.cache_clear()
+
+    invalidations = []
+
+    def invalidate(*args):
+        if not invalidations:
+            invalidations.append(True)
+            cached_db._invalidate_cache(['Sources'])
+
+    sa.event.listen(cached_db.engine, "after_cursor_execute", invalidate)
+    assert len(cached_db.query_region(target)) == 1
+    sa.event.remove(cached_db.engine, "after_cursor_execute", invalidate)
+    assert len(cached_db._coordinate_cache) == 0
+    assert len(cached_db.query_region(target)) == 1
+    assert len(cached_db._coordinate_cache) == 1
+    cached_db.engine.dispose()
+
+
+def test_cross_match(db):
+    targets = SkyCoord([0, 209.301675, 209.3017], [0, 14.477722, 14.4777], frame='icrs', unit='deg')
+    t = db.cross_match(targets)
+    assert list(t['target']) == [1, 2]
+    assert list(t['source']) == ['2MASS J13571237+1428398'] * 2
+    assert t['separation'][0] < 1e-6 and t['separation'].unit == 'arcsec'
+    assert len(db.cross_match(targets, radius=Quantity(1, unit='arcmin'), fmt='pandas')) == 2
+    assert db.cross_match(targets[:1], fmt='default') == []
+    with pytest.raises(RuntimeError):
+        db.cross_match(targets, coordinate_table='NOTABLE')
+
+
+def test_nearest(db):
+    targets = SkyCoord([209.3, 123.1, 0], [14.5, -32, 0], frame='icrs', unit='deg')
+    t = db.nearest(targets)
+    assert list(t['target']) == [0, 1, 2]
+    assert list(t['source']) == ['2MASS J13571237+1428398', 'FAKE', 'FAKE']
+    assert t['separation'].unit == 'arcsec'
+    assert np.isclose(t['separation'][1], targets[1].separation(SkyCoord(123, -32, unit='deg')).arcsec)
+
+    # Sources without coordinates are skipped, so there are only two neighbours
+    t = db.nearest(targets, k=3, fmt='pandas')
+    assert len(t) == 6
+    assert list(t['source'][:2]) == ['2MASS J13571237+1428398', 'FAKE']
+    assert (t.groupby('target')['separation'].diff().dropna() >= 0).all()
+
+    t = db.nearest(targets, k=2, max_radius=Quantity(1, unit='deg'), fmt='default')
+    assert [row[:2] for row in t] == [(0, '2MASS J13571237+1428398'), (1, 'FAKE')]
+    with pytest.raises(RuntimeError):
+        db.nearest(targets, k=0)
+
+
+def test_spatial_join(db):
+    catalog = Table(
+        {'id': [1, 2, 3, 4], 'ra': [209.30, 123.0 + 1 / 3600, 0.0, 209.3], 'dec': [14.477, -32.0, 0.0, 14.0]}
+    )
+    catalog['ra'] = MaskedColumn(catalog['ra'], mask=[False, False, False, True])
+    t = db.spatial_join(catalog, radius=5)
+    assert list(t['id']) == [2]
+    assert list(t['source']) == ['FAKE']
+    assert t['separation'].unit == 'arcsec'
+    expected = SkyCoord(123.0 + 1 / 3600, -32.0, unit='deg').separation(SkyCoord(123, -32, unit='deg')).arcsec
+    assert np.isclose(t['separation'][0], expected)
+
+    # Each match is joined with every row of the output table, across chunks
+    t = db.spatial_join(catalog, radius=Quantity(1, unit='deg'), output_table='Photometry', chunk_size=1)
+    photometry = db.query(db.Photometry).pandas()
+    expected = photometry['source'].value_counts()
+    assert t['source'].tolist() == ['2MASS J13571237+1428398'] * expected['2MASS J13571237+1428398']
+    assert set(t.colnames) >= {'id', 'ra', 'dec', 'band', 'magnitude', 'separation'}
+
+    # Catalog columns clashing with the output table are suffixed
+    t = db.spatial_join(catalog, radius=Quantity(1, unit='deg'), fmt='pandas')
+    assert list(t['id']) == [1, 2]
+    assert {'ra_input', 'ra_Sources'} <= set(t.columns)
+
+    t = db.spatial_join(catalog.to_pandas(), radius=Quantity(180, unit='deg'), nearest_only=True, fmt='default')
+    assert [row[0] for row in t] == [1, 2, 3]
+    assert len(db.spatial_join(catalog[2:], radius=1)) == 0
+
+    # A separation column in the catalog is kept, and the match separation renamed
+    t = db.spatial_join(Table({'id': [2], 'ra': [123.], 'dec': [-32.], 'separation': [1.]}), radius=1)
+    assert list(t['separation_input']) == [1.]
+    assert t['separation_match'].unit == 'arcsec' and t['separation_match'][0] == 0
+    with pytest.raises(RuntimeError):
+        db.spatial_join(catalog, ra_col='RA')
+
+
+def test_proper_motion(tmp_path):
+    # Positions are propagated with proper motions from the coordinate table or a linked astrometry table
+    metadata = sa.MetaData()
+    sa.Table(
+        "Sources",
+        metadata,
+        sa.Column("source", sa.String(100), primary_key=True),
+        sa.Column("ra", sa.Float),
+        sa.Column("dec", sa.Float),
+        sa.Column("pm_ra", sa.Float),
+        sa.Column("pm_dec", sa.Float),
+        sa.Column("epoch", sa.Float),
+    )
+    sa.Table(
+        "ProperMotions",
+        metadata,
+        sa.Column("source", sa.String(100), sa.ForeignKey("Sources.source")),
+        sa.Column("pm_ra", sa.Float),
+        sa.Column("pm_dec", sa.Float),
+    )
+    connection_string = "sqlite:///" + str(tmp_path / "pm.db")
+    engine = sa.create_engine(connection_string)
+    metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(
+            metadata.tables["Sources"].insert(),
+            [
+                {"source": "Fast", "ra": 10.0, "dec": 0.0, "pm_ra": 1000.0, "pm_dec": -500.0, "epoch": 2000.0},
+                {"source": "Slow", "ra": 10.0, "dec": 0.01, "pm_ra": None, "pm_dec": None, "epoch": None},
+            ],
+        )
+        # Sources with several rows use the first in order of the columns, as the table has no primary key
+        conn.execute(
+            metadata.tables["ProperMotions"].insert(),
+            [{"source": "Fast", "pm_ra": 5000.0, "pm_dec": 0.0}, {"source": "Fast", "pm_ra": 0.0, "pm_dec": 1000.0}],
+        )
+    engine.dispose()
+    db = Database(connection_string, lookup_tables=[], coordinate_cache=True)
+
+    # After 10 years, Fast has moved 10 arcsec east and 5 arcsec south
+    target = SkyCoord(10.0 + 10 / 3600, -5 / 3600, frame='icrs', unit='deg')
+    assert len(db.query_region(target, radius=0.1)) == 0
+    t = db.query_region(target, radius=0.1, epoch=Time(2010.0, format='jyear'), epoch_col='epoch')
+    assert list(t['source']) == ['Fast']
+    t = db.cross_match(SkyCoord([target.ra, 10 * u.deg], [target.dec, 0.01 * u.deg]), radius=0.1, epoch=2010.0)
+    assert list(t['source']) == ['Fast', 'Slow']
+
+    # Proper motions from another table, with positions at 1990
+    target = SkyCoord(10.0, 10 / 3600, frame='icrs', unit='deg')
+    t = db.query_region(
+        target, radius=Quantity(5, unit='arcsec'), epoch=2000.0, coordinate_epoch=1990.0, astrometry_table='ProperMotions'
+    )
+    assert list(t['source']) == ['Fast']
+    # One cached entry per set of coordinate and astrometry columns
+    assert len(db._coordinate_cache) == 4
+    db.engine.dispose()
+
+
 def test_sql_query(db):
     # Perform direct SQLite queries
     # Includes testing of _handle_format implicitly
@@ -303,6 +728,18 @@ def test_sql_query(db):
     t = db.sql_query('SELECT * FROM Instruments', fmt='astropy')
     assert len(t) == 0
     assert isinstance(t, Table)
+
+    # Columns with the same name from different tables are kept
+    query = 'SELECT * FROM Sources LEFT JOIN Names ON Sources.source = Names.source ORDER BY Sources.source'
+    rows = db.sql_query(query, fmt='default')
+    t = db.sql_query(query, fmt='pandas')
+    assert t.shape == (len(rows), len(db.Sources.columns) + len(db.Names.columns))
+    assert list(t.columns).count('source') == 2
+    names = t.iloc[:, len(db.Sources.columns)]
+    expected = [row[len(db.Sources.columns)] for row in rows]
+    assert names.isna().tolist() == [name is None for name in expected]
+    assert names.dropna().tolist() == [name for name in expected if name is not None]
+    assert names.isna().any()
     with pytest.warns(DeprecationWarning):
         _ = db.sql_query('SELECT * FROM Sources', format='pandas')
     with pytest.raises(TypeError):
@@ -327,6 +764,87 @@ def test_query_formats(db):
     assert isinstance(t, pd.DataFrame)
 
 
+def test_result_cache(db):
+    db2 = Database(db.engine.url.render_as_string(), cache_size=2)
+    assert db.cache_info() is None
+
+    t1 = db2.search_object('fake', verbose=False)
+    t2 = db2.search_object('fake', verbose=False, fmt='table')  # same normalised arguments
+    assert db2.cache_info()['hits'] == 1 and db2.cache_info()['misses'] == 1
+    assert np.all(t1 == t2)
+
+    # Results are copies, modifying them does not change the cache
+    t2['ra'] = 0
+    assert db2.search_object('fake', verbose=False)['ra'][0] == t1['ra'][0]
+
+    coords = SkyCoord(209.301675, 14.477722, frame='icrs', unit='deg')
+    db2.query_region(coords)
+    db2.query_region(SkyCoord(209.301675, 14.477722, frame='icrs', unit='deg'))
+    assert db2.cache_info()['hits'] == 3
+
+    # Size-based eviction
+    db2.sql_query('SELECT * FROM Sources')
+    assert db2.cache_info()['size'] == 2
+    assert db2.cache_info()['evictions'] == 1
+
+    # Writes invalidate results of the affected tables only
+    data = pd.DataFrame([{'source': 'FAKE', 'other_name': 'Cached penguin'}])
+    db2.add_table_data(data, 'Names', fmt='pandas')
+    assert db2.cache_info()['size'] == 1  # query_region result is kept
+    assert len(db2.search_object('cached penguin', verbose=False)) == 1
+    with db2.engine.begin() as conn:
+        conn.execute(db2.Names.delete().where(db2.Names.c.other_name == 'Cached penguin'))
+    db2.cache_clear()
+    assert db2.cache_info()['size'] == 0
+    db2.engine.dispose()
+
+    # Expiry
+    db3 = Database(db.engine.url.render_as_string(), cache_size=10, cache_ttl=0)
+    db3.sql_query('SELECT * FROM Sources')
+    db3.sql_query('SELECT * FROM Sources')
+    assert db3.cache_info()['hits'] == 0
+    assert db3.cache_info()['evictions'] == 1
+    db3.engine.dispose()
+
+
+def test_format_column_types(db):
+    # Check that column types come from the schema and NULL values are masked rather than turning columns into objects
+    t = db.query(db.Sources).table()
+    assert t['ra'].dtype == np.float64
+    assert t['ra'].mask.sum() == 1  # Third star has no coordinates
+    t = db.sql_query('SELECT source, ra, dec FROM Sources', fmt='pandas')
+    assert t['dec'].dtype == np.float64
+    assert t['dec'].isna().sum() == 1
+    t = db.search_object('1357', output_table='SpectralTypes', fmt='astropy')
+    assert t['best'].dtype == bool
+    assert t['spectral_type_error'].dtype == np.float64
+    t = db.search_object('1357', output_table='SpectralTypes', fmt='pandas')
+    assert t['spectral_type_error'].dtype == np.float64
+
+    # Results that do not match the schema type fall back to inferring the type
+    t = db.sql_query("SELECT source, 'not a number' AS ra FROM Sources", fmt='astropy')
+    assert t['ra'][0] == 'not a number'
+
+
+def test_query_batches(db):
+    # Check that results can be streamed in chunks
+    batches = list(db.query(db.Sources).iter_batches(size=2))
+    assert len(batches) == 2
+    assert all(isinstance(b, Table) for b in batches)
+    assert sum(len(b) for b in batches) == 3
+    batches = list(db.query(db.Sources).filter(db.Sources.c.dec > 0).iter_batches(size=2, fmt='pandas'))
+    assert len(batches) == 1
+    assert isinstance(batches[0], pd.DataFrame)
+    assert batches[0]['source'][0] == '2MASS J13571237+1428398'
+    assert len(list(db.query(db.Instruments).iter_batches())) == 0
+
+    batches = list(db.sql_query('SELECT * FROM Sources', fmt='astropy', chunksize=2))
+    assert [len(b) for b in batches] == [2, 1]
+    batches = list(db.sql_query('SELECT * FROM Sources', chunksize=5))
+    assert len(batches) == 1
+    assert isinstance(batches[0], list)
+
+
 @mock.patch('astrodbkit.astrodb.load_spectrum')
 def test_query_spectra(mock_spectrum, db):
     # Test special conversions in query methods
@@ -429,6 +947,104 @@ def test_views(db):
     assert 'SampleView' not in db.inventory('2MASS J13571237+1428398').keys()
 
 
+def test_materialized_views(db):
+    # The view gets its own MetaData so that it is not created by later create_all calls on db.metadata
+    view_metadata = sa.MetaData()
+    PhotMatView = materialized_view(
+        "PhotMatView",
+        view_metadata,
+        sa.select(
+            db.Sources.c.source.label("source"),
+            db.Photometry.c.band.label("band"),
+            db.Photometry.c.magnitude.label("value"),
+        ).select_from(db.Sources).join(db.Photometry, db.Sources.c.source == db.Photometry.c.source),
+        key="source",
+    )
+    with db.engine.begin() as conn:
+        view_metadata.create_all(conn)
+    assert db.query(PhotMatView).count() == 3
+    assert 'PhotMatView' in sa.inspect(db.engine).get_view_names()
+
+    # Stored rows only change when refreshed
+    source = '2MASS J13571237+1428398'
+    with db.engine.begin() as conn:
+        conn.execute(db.Photometry.update().where(db.Photometry.c.band == 'WISE_W1').values(magnitude=99))
+    assert db.query(PhotMatView.c.value).filter(PhotMatView.c.band == 'WISE_W1').scalar() != 99
+    with db.engine.begin() as conn:
+        refresh_materialized_view(conn, PhotMatView, keys=['FAKE'])
+    assert db.query(PhotMatView.c.value).filter(PhotMatView.c.band == 'WISE_W1').scalar() != 99
+    with db.engine.begin() as conn:
+        refresh_materialized_view(conn, PhotMatView, keys=[source])
+    assert db.query(PhotMatView.c.value).filter(PhotMatView.c.band == 'WISE_W1').scalar() == 99
+    assert db.query(PhotMatView).count() == 3
+
+    # Full refresh; restore the original value
+    with db.engine.begin() as conn:
+        conn.execute(db.Photometry.update().where(db.Photometry.c.band == 'WISE_W1').values(magnitude=13.348))
+        refresh_materialized_view(conn, PhotMatView)
+    assert db.query(PhotMatView.c.value).filter(PhotMatView.c.band == 'WISE_W1').scalar() == 13.348
+
+    # Storage of the materialized view is not reflected or used in inventory
+    db2 = Database(db.engine.url.render_as_string())
+    assert not any(name.startswith(MATERIALIZED_VIEW_PREFIX) for name in db2.metadata.tables)
+    assert 'PhotMatView' not in db2.inventory(source).keys()
+    db2.engine.dispose()
+
+
+def test_summary_table(db):
+    spec = {
+        "ra": {"table": "Sources", "column": "ra"},
+        "W1": {"table": "Photometry", "column": "magnitude", "where": {"band": "WISE_W1"}},
+        "n_photometry": {"table": "Photometry", "aggregate": "count"},
+    }
+    summary = db.create_summary_table("SourceSummary", spec)
+    assert db.SourceSummary is summary
+    t = db.query(summary).table()
+    assert t.colnames == ["source", "ra", "W1", "n_photometry"]
+    assert len(t) == db.query(db.Sources).count()
+    row = db.query(summary).filter(summary.c.source == '2MASS J13571237+1428398').one()
+    assert row.W1 == 13.348
+    assert row.n_photometry == 3
+
+    # Rows are refreshed when data is added
+    data = pd.DataFrame([{'source': 'FAKE', 'band': 'WISE_W1', 'magnitude': 15.0, 'reference': 'Schm10'}])
+    db.add_table_data(data, 'Photometry', fmt='pandas')
+    row = db.query(summary).filter(summary.c.source == 'FAKE').one()
+    assert row.W1 == 15.0
+    assert row.n_photometry == 1
+
+    # Refreshes are deferred to the end of the block
+    data = pd.DataFrame([{'source': 'FAKE', 'band': 'WISE_W2', 'magnitude': 14.0, 'reference': 'Schm10'}])
+    with db.deferred_summary_refresh():
+        db.add_table_data(data, 'Photometry', fmt='pandas')
+        assert db.query(summary).filter(summary.c.source == 'FAKE').one().n_photometry == 1
+    assert db.query(summary).filter(summary.c.source == 'FAKE').one().n_photometry == 2
+
+    # The first matching row is taken in order of order_by, then of the primary key
+    spec = {
+        "band": {"table": "Photometry", "column": "band"},
+        "brightest": {"table": "Photometry", "column": "band", "order_by": "magnitude"},
+    }
+    ordered = db.create_summary_table("OrderedSummary", spec)
+    row = db.query(ordered).filter(ordered.c.source == 'FAKE').one()
+    assert (row.band, row.brightest) == ('WISE_W1', 'WISE_W2')
+
+    # Registering it again reuses the stored rows, replacing rebuilds it
+    db.create_summary_table("SourceSummary", {"ra": {"table": "Sources", "column": "ra"}}, replace=True)
+    assert db.query(db.SourceSummary).table().colnames == ["source", "ra"]
+
+    with pytest.raises(RuntimeError, match='not found'):
+        db.refresh_summary_table("Missing")
+
+    # Remove the test data and summary
+    with db.engine.begin() as conn:
+        conn.execute(db.Photometry.delete().where(db.Photometry.c.source == 'FAKE'))
+        drop_materialized_view(conn, db.SourceSummary)
+        drop_materialized_view(conn, ordered)
+    db._summary_tables.clear()
+    assert 'SourceSummary' not in sa.inspect(db.engine).get_view_names()
+
+
 def test_save_reference_table(db, db_dir):
     # Test saving a reference table
     ref_dir = "reference"
@@ -465,7 +1081,7 @@ def test_save_database(db, db_dir):
     assert data == db.inventory('2MASS J13571237+1428398')
 
 
-def test_load_database(db, db_dir):
+def test_load_database(db, db_dir, capsys):
     # Test loading database from JSON files
 
     # First clear some of the tables
@@ -481,7 +1097,8 @@ def test_load_database(db, db_dir):
     # Reload the database and check DB contents
     assert os.path.exists(db_dir)
     assert os.path.exists(os.path.join(db_dir, "reference", 'Publications.json'))
-    db.load_database(db_dir, verbose=True)
+    db.load_database(db_dir, verbose=True, max_workers=2, batch_size=2)
+    assert "Loaded 3 source files" in capsys.readouterr().out
     assert db.query(db.Publications).count() == 2
     assert db.query(db.Photometry).count() == 3
     assert db.query(db.Sources).count() == 3
@@ -496,13 +1113,144 @@ def test_load_database(db, db_dir):
             shutil.rmtree(file_path)
 
 
-def test_copy_database_schema():
+def test_immediate_foreign_keys(db):
+    # Foreign keys without DEFERRABLE are still checked on every row by PostgreSQL in single-transaction loads
+    assert "Sources(reference)" in _immediate_foreign_keys(db.metadata)
+
+    metadata = sa.MetaData()
+    sa.Table("Parent", metadata, sa.Column("id", sa.Integer, primary_key=True))
+    sa.Table(
+        "Child",
+        metadata,
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("parent", sa.Integer, sa.ForeignKey("Parent.id", deferrable=True, initially="IMMEDIATE")),
+        sa.Column("other", sa.Integer, sa.ForeignKey("Parent.id")),
+    )
+    assert _immediate_foreign_keys(metadata) == ["Child(other)"]
+
+
+def test_single_transaction_load(db, tmp_path, capsys):
+    # Loading in one transaction checks foreign keys at the end and leaves the database unchanged on violations
+    db.save_database(str(tmp_path))
+    counts = {table: db.query(db.metadata.tables[table]).count() for table in db.metadata.tables}
+    indexes = sa.inspect(db.engine).get_indexes("Sources")
+    assert db.check_foreign_keys() == []
+
+    db.load_database(str(tmp_path), verbose=True, single_transaction=True, rebuild_indexes=True)
+    assert "Checking foreign keys" in capsys.readouterr().out
+    assert {table: db.query(db.metadata.tables[table]).count() for table in db.metadata.tables} == counts
+    assert sa.inspect(db.engine).get_indexes("Sources") == indexes
+
+    filename = os.path.join(tmp_path, "source", os.listdir(os.path.join(tmp_path, "source"))[0])
+    with open(filename) as f:
+        data = json.load(f)
+    data["Sources"][0]["source"] = "Unknown Source"
+    data["Sources"][0]["reference"] = "Missing Reference"
+    with open(filename, "w") as f:
+        json.dump(data, f)
+    with pytest.raises(RuntimeError, match="foreign key violation") as error:
+        db.load_database(str(tmp_path), single_transaction=True)
+    assert "Sources(reference) = ('Missing Reference',) not found in Publications" in str(error.value)
+    assert {table: db.query(db.metadata.tables[table]).count() for table in db.metadata.tables} == counts
+    assert db.query(db.Sources).filter(db.Sources.c.source == "Unknown Source").count() == 0
+
+    # Foreign key checks are enabled again afterwards
+    with pytest.raises(IntegrityError):
+        with db.engine.begin() as conn:
+            conn.execute(db.Sources.insert().values(source="Unknown Source", ra=0, dec=0, reference="Missing"))
+    with pytest.raises(RuntimeError, match="rebuild_indexes"):
+        db.load_database(str(tmp_path), rebuild_indexes=True)
+
+
+def test_archive(db, tmp_path):
+    # Round trip through a single-file archive gives the same per-source JSON files
+    def read_files(directory):
+        return {
+            os.path.relpath(os.path.join(root, file), directory): open(os.path.join(root, file)).read()
+            for root, _, files in os.walk(directory)
+            for file in files
+        }
+
+    (tmp_path / "before").mkdir()
+    (tmp_path / "after").mkdir()
+    db.save_database(str(tmp_path / "before"))
+    counts = {table: db.query(db.metadata.tables[table]).count() for table in db.metadata.tables}
+
+    filename = str(tmp_path / "db.zip")
+    db.save_archive(filename, compression="lzma", batch_size=2)
+    with zipfile.ZipFile(filename) as archive:
+        assert json.loads(archive.read("manifest.json"))["tables"]["Photometry"] == counts["Photometry"]
+    db.load_archive(filename, batch_size=2, verbose=True)
+    assert {table: db.query(db.metadata.tables[table]).count() for table in db.metadata.tables} == counts
+    db.save_database(str(tmp_path / "after"))
+    assert read_files(tmp_path / "after") == read_files(tmp_path / "before")
+
+    with pytest.raises(RuntimeError, match="Compression"):
+        db.save_archive(filename, compression="gzip")
+    with zipfile.ZipFile(tmp_path / "other.zip", "w") as archive:
+        archive.writestr("Sources.jsonl", "")
+    with pytest.raises(RuntimeError, match="not an AstrodbKit archive"):
+        db.load_archive(str(tmp_path / "other.zip"))
+    assert db.query(db.Sources).count() == counts["Sources"]
+
+
+def test_load_json_dates(tmp_path):
+    # Only date/time columns are converted from strings when loading JSON
+    metadata = sa.MetaData()
+    sa.Table(
+        "Sources",
+        metadata,
+        sa.Column("source", sa.String(100), primary_key=True),
+        sa.Column("comments", sa.String(100)),
+        sa.Column("observed", sa.DateTime),
+        sa.Column("night", sa.Date),
+    )
+    connection_string = "sqlite:///" + str(tmp_path / "dates.db")
+    engine = sa.create_engine(connection_string)
+    metadata.create_all(engine)
+    engine.dispose()
+
+    db = Database(connection_string, lookup_tables=[])
+    assert set(db._temporal_columns["Sources"]) == {"observed", "night"}
+
+    filename = tmp_path / "source.json"
+    row = {"source": "FAKE", "comments": "2018-12-06", "observed": "2018-12-06T12:30:00", "night": "2018-12-06"}
+    filename.write_text(json.dumps({"Sources": [row]}))
+    db.load_json(str(filename))
+    result = db.query(db.Sources).pandas().to_dict(orient="records")[0]
+    assert result["comments"] == "2018-12-06"
+    assert result["observed"] == datetime.datetime(2018, 12, 6, 12, 30)
+    assert result["night"] == datetime.date(2018, 12, 6)
+
+    db.save_json("FAKE", str(tmp_path))
+    with open(tmp_path / "fake.json") as f:
+        assert json.load(f)["Sources"][0]["observed"] == "2018-12-06T12:30:00"
+    db.engine.dispose()
+
+
+def test_prefetch():
+    # Results come back in order, and reads stay a bounded number of items ahead of the consumer
+    started = []
+
+    def read(i):
+        started.append(i)
+        return i * 2
+
+    results = _prefetch(read, range(100), max_workers=3, queue_size=5)
+    assert next(results) == 0
+    assert max(started) < 6
+    assert list(results) == [i * 2 for i in range(1, 100)]
+
+
+def test_copy_database_schema(capsys):
     connection_1 = 'sqlite:///' + DB_PATH
     connection_2 = 'sqlite:///second.db'
     if os.path.exists('second.db'):
         os.remove('second.db')
 
-    copy_database_schema(connection_1, connection_2, copy_data=True)
+    # Small batches to exercise the streaming copy
+    copy_database_schema(connection_1, connection_2, copy_data=True, batch_size=2, max_workers=2, verbose=True)
+    assert 'Sources: 3 rows' in capsys.readouterr().out
 
     db2 = Database(connection_2)
     assert db2
@@ -518,6 +1266,14 @@ def test_copy_database_schema():
         os.remove('second.db')
 
 
+def test_foreign_key_levels():
+    levels = [[t.name for t in level] for level in _foreign_key_levels(Base.metadata.sorted_tables)]
+    assert levels[0] == ['Publications']
+    assert 'Sources' in levels[1] and 'Telescopes' in levels[1]
+    assert 'Photometry' in levels[-1]
+    assert sum(len(level) for level in levels) == len(Base.metadata.tables)
+
+
 def test_remove_database(db):
     db.session.close()
     db.engine.dispose()
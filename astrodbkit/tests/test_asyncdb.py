@@ -0,0 +1,110 @@
+# Testing for the asyncio database interface
+
+import asyncio
+import os
+
+import pandas as pd
+import pytest
+from astropy.coordinates import SkyCoord
+from astropy.table import Table
+
+from astrodbkit.astrodb import Database, create_database
+from astrodbkit.schema_example import *
+
+pytest.importorskip("aiosqlite")
+
+from astrodbkit.asyncdb import AsyncDatabase  # noqa: E402
+
+DB_PATH = "async_temp.db"
+
+
+@pytest.fixture(scope="module")
+def db_path():
+    # Create a small database with the synchronous interface
+    if os.path.exists(DB_PATH):
+        os.remove(DB_PATH)
+    connection_string = "sqlite:///" + DB_PATH
+    create_database(connection_string)
+    db = Database(connection_string)
+    with db.engine.begin() as conn:
+        conn.execute(db.Publications.insert().values([{"name": "Schm10"}]))
+        conn.execute(
+            db.Sources.insert().values(
+                [
+                    {"source": "2MASS J13571237+1428398", "ra": 209.301675, "dec": 14.477722, "reference": "Schm10"},
+                    {"source": "FAKE", "ra": 123, "dec": -32, "reference": "Schm10"},
+                ]
+            )
+        )
+        conn.execute(db.Names.insert().values([{"source": "FAKE", "other_name": "Penguin"}]))
+    db.session.close()
+    db.engine.dispose()
+
+    yield DB_PATH
+
+    if os.path.exists(DB_PATH):
+        os.remove(DB_PATH)
+
+
+def test_async_database(db_path):
+    async def run_queries():
+        async with AsyncDatabase("sqlite+aiosqlite:///" + db_path) as db:
+            assert "Sources" in db.metadata.tables
+            assert "source" in [c.name for c in db.Sources.columns]
+
+            # Run several queries concurrently against the pool
+            return await asyncio.gather(
+                db.search_object("engu", verbose=False),
+                db.search_string("fake", verbose=False),
+                db.query_region(SkyCoord(209.301675, 14.477722, frame="icrs", unit="deg")),
+                db.inventory("FAKE"),
+                db.sql_query("SELECT * FROM Sources", fmt="pandas"),
+            )
+
+    t, d, region, inventory, df = asyncio.run(run_queries())
+    assert isinstance(t, Table)
+    assert t["source"][0] == "FAKE"
+    assert d["Sources"]["source"] == "FAKE"
+    assert region["source"][0] == "2MASS J13571237+1428398"
+    assert inventory["Names"] == [{"other_name": "Penguin"}]
+    assert isinstance(df, pd.DataFrame)
+    assert len(df) == 2
+
+
+def test_async_sql_query_chunks(db_path):
+    async def run_query():
+        async with AsyncDatabase("sqlite+aiosqlite:///" + db_path) as db:
+            return [chunk async for chunk in await db.sql_query("SELECT * FROM Sources", fmt="pandas", chunksize=1)]
+
+    chunks = asyncio.run(run_query())
+    assert [len(chunk) for chunk in chunks] == [1, 1]
+    assert all(isinstance(chunk, pd.DataFrame) for chunk in chunks)
+    assert sorted(pd.concat(chunks)["source"]) == ["2MASS J13571237+1428398", "FAKE"]
+
+
+def test_async_not_connected(db_path):
+    async def run_query(**kwargs):
+        db = AsyncDatabase("sqlite+aiosqlite:///" + db_path)
+        try:
+            await db.sql_query("SELECT * FROM Sources", **kwargs)
+        finally:
+            await db.close()
+
+    with pytest.raises(RuntimeError, match="connect"):
+        asyncio.run(run_query())
+    with pytest.raises(RuntimeError, match="connect"):
+        asyncio.run(run_query(chunksize=10))
+
+
+def test_async_search_index(db_path):
+    # The full-text index built with the synchronous interface is used by the async driver too
+    db = Database("sqlite:///" + db_path)
+    db.build_search_index()
+    db.engine.dispose()
+
+    async def run_search():
+        async with AsyncDatabase("sqlite+aiosqlite:///" + db_path) as db:
+            return await db.search_string("engu", verbose=False, use_index=True)
+
+    d = asyncio.run(run_search())
+    assert d["Names"]["other_name"] == "Penguin"
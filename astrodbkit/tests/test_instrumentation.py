@@ -0,0 +1,91 @@
+# Testing for instrumentation hooks
+
+import pytest
+import sqlalchemy as sa
+
+from astrodbkit import instrumentation
+from astrodbkit.astrodb import Database
+from astrodbkit.instrumentation import add_hook, profile, remove_hook, span
+from astrodbkit.schema_example import *
+
+
+def test_span_disabled():
+    # Without callbacks, spans are a shared no-op and SQL events are not listened to
+    assert span("format") is span("sql")
+    assert not instrumentation._sql_engines
+
+
+def test_hooks():
+    events = []
+
+    def callback(stage, elapsed, attributes):
+        events.append((stage, elapsed, attributes))
+
+    engine = sa.create_engine("sqlite://")
+    other_engine = sa.create_engine("sqlite://")
+    add_hook(callback, engine)
+    try:
+        with span("custom", rows=3) as s:
+            s.set_attribute("extra", True)
+        with engine.connect() as conn:
+            conn.execute(sa.text("SELECT 1"))
+        # SQL on other engines is not timed
+        with other_engine.connect() as conn:
+            conn.execute(sa.text("SELECT 2"))
+    finally:
+        remove_hook(callback)
+
+    assert events[0][0] == "custom" and events[0][2] == {"rows": 3, "extra": True}
+    assert events[0][1] >= 0
+    statements = [(e[0], e[2].get("statement")) for e in events]
+    assert ("sql", "SELECT 1") in statements
+    assert ("sql", "SELECT 2") not in statements
+    assert not instrumentation._sql_engines
+    assert not engine.dispatch.after_cursor_execute
+
+
+def test_hook_errors():
+    # A failing callback gives a warning and does not interrupt queries or other callbacks
+    events = []
+
+    def failing(stage, elapsed, attributes):
+        raise ValueError("broken")
+
+    def callback(stage, elapsed, attributes):
+        events.append(stage)
+
+    engine = sa.create_engine("sqlite://")
+    add_hook(failing, engine)
+    add_hook(callback, engine)
+    try:
+        with pytest.warns(RuntimeWarning, match="broken"):
+            with engine.connect() as conn:
+                assert conn.execute(sa.text("SELECT 1")).scalar() == 1
+    finally:
+        remove_hook(failing)
+        remove_hook(callback)
+
+    assert events == ["sql"]
+    assert not instrumentation._hooks and not instrumentation._sql_engines
+
+
+def test_profile(capsys):
+    db = Database("sqlite://")
+    with db.engine.begin() as conn:
+        conn.execute(db.Publications.insert().values([{"name": "Schm10"}]))
+        conn.execute(db.Sources.insert().values([{"source": "FAKE", "ra": 1, "dec": 2, "reference": "Schm10"}]))
+
+    with profile(db) as p:
+        db.query(db.Sources).astropy()
+        db.sql_query("SELECT * FROM Sources", fmt="pandas")
+
+    assert p.stages["sql"]["calls"] == 2
+    assert p.stages["astropy"]["rows"] == 1
+    assert p.stages["format"]["calls"] == 1
+    assert p.stages["pandas"]["rows"] == 1
+    output = capsys.readouterr().out
+    assert "stage" in output and "sql" in output
+
+    # Nothing is collected after the block
+    db.sql_query("SELECT * FROM Sources")
+    assert p.stages["sql"]["calls"] == 2
@@ -5,10 +5,21 @@ from datetime import datetime
 from decimal import Decimal
 from io import StringIO
 
+import numpy as np
 import pytest
+import sqlalchemy as sa
 from astropy.table import Table
 
-from astrodbkit.utils import _name_formatter, datetime_json_parser, get_simbad_names, json_serializer
+from astrodbkit.utils import (
+    _name_formatter,
+    datetime_json_parser,
+    get_simbad_names,
+    json_dumps,
+    json_lines,
+    json_loads,
+    json_serializer,
+    register_json_backend,
+)
 
 try:
     import mock
@@ -16,6 +27,95 @@ except ImportError:
     from unittest import mock
 
 
+JSON_DATA = {
+    'Sources': [{'source': 'V4046 Sgr', 'ra': 273.54, 'dec': -32.79, 'comments': None, 'flag': True}],
+    'Photometry': [{'band': 'WISE_W1', 'magnitude': 1e-05, 'error': 2.5e+16, 'count': 12, 'value': 0.1}],
+    'Names': [{'other_name': 'Caf\u00e9 \U0001F600 \x7f "quoted" \\ 1e5, x: 2.0'}],
+    'Extra': [{'date': datetime(2018, 12, 6, 12, 30, 0), 'value': Decimal('2.3'), 'bytes': b'byte'}],
+    'Numeric': [{'small': Decimal('1e-5'), 'large': Decimal('12345678901234567890'), 'integer': Decimal('3')}],
+    'Empty': [[], {}, [{}]],
+    'Nested': {'a': {'b': {'c': [1, [2.5, None]]}}},
+}
+
+
+@pytest.mark.parametrize('backend', ['auto', 'json', 'orjson', 'msgspec'])
+def test_json_dumps(backend):
+    if backend in ('orjson', 'msgspec'):
+        pytest.importorskip(backend)
+    expected = json.dumps(JSON_DATA, indent=4, default=json_serializer)
+    assert json_dumps(JSON_DATA, backend=backend) == expected
+
+    # Decimals (eg, from PostgreSQL Numeric columns) are formatted like floats by the standard library
+    data = {'small': Decimal('1e-5'), 'large': Decimal('12345678901234567890'), 'nan': Decimal('NaN')}
+    assert json_dumps(data, backend=backend) == json.dumps(data, indent=4, default=json_serializer)
+    assert json_dumps(data['small'], backend=backend) == '1e-05'
+
+    # Values other encoders cannot reproduce use the standard library
+    data = {'nan': float('nan'), 'inf': float('inf'), 'numpy': np.float64(1.5)}
+    assert json_dumps(data, backend=backend) == '{\n    "nan": NaN,\n    "inf": Infinity,\n    "numpy": 1.5\n}'
+
+
+def test_json_backends():
+    with pytest.raises(RuntimeError, match='Unrecognized JSON backend'):
+        json_dumps({}, backend='fast')
+
+    # Custom backends are given the data and return 2-space indented text
+    calls = []
+
+    def dumps(data):
+        calls.append(data)
+        return json.dumps(data, indent=2, ensure_ascii=False, default=json_serializer)
+
+    register_json_backend('custom', dumps)
+    assert json_dumps(JSON_DATA, backend='custom') == json.dumps(JSON_DATA, indent=4, default=json_serializer)
+    assert len(calls) == 1
+
+
+@pytest.mark.parametrize('backend', ['auto', 'json', 'orjson'])
+def test_json_lines(backend):
+    if backend == 'orjson':
+        pytest.importorskip(backend)
+    rows = [JSON_DATA['Sources'][0], JSON_DATA['Photometry'][0], {'nan': float('nan'), 'numpy': np.float64(1.5)}]
+    text = json_lines(rows, backend=backend)
+    assert text.count(b'\n') == 3
+    parsed = [json.loads(line) for line in text.splitlines()]
+    assert parsed[:2] == rows[:2]
+    assert np.isnan(parsed[2]['nan']) and parsed[2]['numpy'] == 1.5
+
+
+def test_json_column_names():
+    # SQLAlchemy column names are str subclasses, which fast encoders must accept without falling back
+    orjson = pytest.importorskip('orjson')
+    data = [{sa.sql.quoted_name('source', None): 'V4046 Sgr', 'ra': 273.54}]
+    with mock.patch('json.dumps', side_effect=AssertionError('fell back to the standard library')):
+        assert json_lines(data, backend='orjson') == orjson.dumps({'source': 'V4046 Sgr', 'ra': 273.54}) + b'\n'
+        assert json_loads(json_dumps(data, backend='orjson')) == data
+
+
+@pytest.mark.parametrize('backend', ['auto', 'json', 'orjson', 'msgspec'])
+def test_json_non_str_keys(backend):
+    # Keys that are not strings are written by the standard library, like other values fast encoders format differently
+    if backend in ('orjson', 'msgspec'):
+        pytest.importorskip(backend)
+    data = {1e-5: 'small', 1e20: 'large', float('nan'): 'nan', 2: 'int', True: 'bool', None: 'none'}
+    assert json_dumps(data, backend=backend) == json.dumps(data, indent=4, default=json_serializer)
+    with pytest.raises(TypeError):
+        json_dumps({datetime(2018, 12, 6).date(): 1}, backend=backend)
+
+
+@pytest.mark.parametrize('backend', ['auto', 'json', 'orjson'])
+def test_json_loads(backend):
+    if backend == 'orjson':
+        pytest.importorskip(backend)
+    text = json_dumps(JSON_DATA)
+    assert json_loads(text, backend=backend) == json.loads(text)
+    assert json_loads(text.encode('utf-8'), backend=backend) == json.loads(text)
+
+    # Date strings are left as strings; values other parsers reject fall back to the standard library
+    assert json_loads('{"date": "2018-12-06T12:30:00"}', backend=backend) == {'date': '2018-12-06T12:30:00'}
+    assert np.isnan(json_loads('{"value": NaN}', backend=backend)['value'])
+
+
 @pytest.mark.parametrize('test_input, expected', [
     ('TWA  27', 'TWA 27'),
     ('HIDDEN A', None),
@@ -2,6 +2,7 @@
 # Adapted from https://github.com/sqlalchemy/sqlalchemy/wiki/Views
 
 import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.orm import Session, declarative_base
 
 from astrodbkit.views import *
@@ -80,4 +81,33 @@ def test_views():
             return f"MyStuff({self.id!r}, {self.data!r}, {self.moredata!r})"
 
     with Session(engine) as s:
-        assert s.query(MyStuff).count() == 2
\ No newline at end of file
+        assert s.query(MyStuff).count() == 2
+
+
+def test_materialized_view_postgresql_ddl():
+    # Names are quoted so that PostgreSQL keeps their case, matching the table object used in queries
+    metadata = sa.MetaData()
+    sources = sa.Table("Sources", metadata, sa.Column("source", sa.String(50), primary_key=True))
+    mview = materialized_view("SourceSummary", sa.MetaData(), sa.select(sources.c.source), key="source")
+    dialect = postgresql.dialect()
+
+    create = str(CreateMaterializedView("SourceSummary", mview.definition).compile(dialect=dialect))
+    assert create.startswith('CREATE MATERIALIZED VIEW "SourceSummary" AS SELECT')
+    assert str(DropMaterializedView("SourceSummary").compile(dialect=dialect)) == 'DROP MATERIALIZED VIEW "SourceSummary"'
+    assert '"SourceSummary"' in str(sa.select(mview).compile(dialect=dialect))
+    assert materialized_view_storage(dialect, "SourceSummary") == '"SourceSummary"'
+    assert materialized_view_storage(sa.create_engine("sqlite://").dialect, "SourceSummary") == (
+        '"' + MATERIALIZED_VIEW_PREFIX + 'SourceSummary"'
+    )
+
+    class Connection:
+        def __init__(self):
+            self.dialect = dialect
+            self.statements = []
+
+        def execute(self, statement):
+            self.statements.append(str(statement))
+
+    connection = Connection()
+    refresh_materialized_view(connection, mview)
+    assert connection.statements == ['REFRESH MATERIALIZED VIEW "SourceSummary"']
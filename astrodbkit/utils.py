@@ -1,14 +1,23 @@
 """Utility functions for Astrodbkit"""
 
 import functools
+import json
+import math
 import re
 import warnings
-from datetime import datetime
+from datetime import date, datetime, time
 from decimal import Decimal
 
-from astroquery.simbad import Simbad
+__all__ = ["json_serializer", "json_dumps", "json_loads", "json_lines", "register_json_backend", "get_simbad_names"]
 
-__all__ = ["json_serializer", "get_simbad_names"]
+
+def __getattr__(name):
+    # astroquery is slow to import, so Simbad is only loaded when first accessed
+    if name == "Simbad":
+        from astroquery.simbad import Simbad  # noqa: PLC0415
+
+        return Simbad
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def deprecated_alias(**aliases):
@@ -42,10 +51,10 @@ def rename_kwargs(func_name, kwargs, aliases):
 
 def json_serializer(obj):
     """Function describing how things should be serialized in JSON.
-    Datetime objects are saved with datetime.isoformat(), Parameter class objects use clean_dict()
+    Date, time, and datetime objects are saved with isoformat(), Parameter class objects use clean_dict()
     while all others use __dict__"""
 
-    if isinstance(obj, datetime):
+    if isinstance(obj, (date, time)):
         return obj.isoformat()
 
     if isinstance(obj, Decimal):
@@ -57,6 +66,266 @@ def json_serializer(obj):
     return obj.__dict__
 
 
+# Tokens of JSON output from other encoders that may differ from the standard library:
+# strings (non-ASCII characters are not escaped) and floats (exponent notation)
+_JSON_TOKEN = re.compile(r'("(?:[^"\\]|\\.)*")|(-?\d+(?:\.\d+)?[eE][-+]?\d+|-?\d+\.\d+)')
+
+
+def _float_status(obj):
+    # 2 if the data has NaN/Infinity (written as null by fast encoders), 1 if it has floats that Python writes
+    # in exponent notation (formatted differently by other encoders), 0 otherwise
+    status = 0
+    stack = [obj]
+    while stack:
+        value = stack.pop()
+        value_type = type(value)
+        if value_type is dict:
+            stack.extend(value.values())
+        elif value_type is list or value_type is tuple:
+            stack.extend(value)
+        elif value_type is float:
+            if not math.isfinite(value):
+                return 2
+            if value != 0 and not 1e-4 <= abs(value) < 1e16:
+                status = 1
+        elif value_type is Decimal:
+            # Written as floats by json_serializer, after the fast encoders have formatted them their own way
+            if not value.is_finite():
+                return 2
+            status = 1
+    return status
+
+
+def _normalize_json(text, floats=True):
+    # Rewrite 2-space indented JSON text from another encoder to match json.dumps(indent=4) exactly
+    # Indentation: after step k, lines at depth d >= k have 2d + 2k spaces, so no line is widened twice
+    k = 0
+    while "\n" + " " * (4 * k + 2) in text:
+        text = text.replace("\n" + " " * (4 * k + 2), "\n" + " " * (4 * k + 4))
+        k += 1
+
+    if not floats and text.isascii() and "\x7f" not in text:
+        return text
+
+    def replace(match):
+        string, number = match.groups()
+        if string is not None:
+            if string.isascii() and "\x7f" not in string:
+                return string
+            return json.dumps(json.loads(string))
+        return repr(float(number))
+
+    return _JSON_TOKEN.sub(replace, text)
+
+
+def _str_keys(obj):
+    # Copy of the data with str subclass keys (eg, SQLAlchemy column names) as plain str, which orjson requires.
+    # Other keys are kept, so that orjson rejects them and the standard library formats them.
+    obj_type = type(obj)
+    if obj_type is dict:
+        return {(str(k) if isinstance(k, str) else k): _str_keys(v) for k, v in obj.items()}
+    if obj_type is list or obj_type is tuple:
+        return [_str_keys(v) for v in obj]
+    return obj
+
+
+def _orjson_dumps(data, option):
+    import orjson  # noqa: PLC0415
+
+    try:
+        return orjson.dumps(data, default=json_serializer, option=option)
+    except TypeError:
+        return orjson.dumps(_str_keys(data), default=json_serializer, option=option)
+
+
+def _json_dumps_orjson(data):
+    import orjson  # noqa: PLC0415
+
+    return _orjson_dumps(data, orjson.OPT_INDENT_2 | orjson.OPT_PASSTHROUGH_DATETIME).decode("utf-8")
+
+
+def _json_dumps_msgspec(data):
+    import msgspec  # noqa: PLC0415
+
+    return msgspec.json.format(msgspec.json.encode(data, enc_hook=json_serializer), indent=2).decode("utf-8")
+
+
+# Available JSON backends: name -> (module that must be installed, function returning 2-space indented JSON text)
+# The standard library (json) is used directly instead.
+_JSON_BACKENDS = {
+    "orjson": ("orjson", _json_dumps_orjson),
+    "msgspec": ("msgspec", _json_dumps_msgspec),
+    "json": (None, None),
+}
+
+
+def register_json_backend(name, dumps, module=None):
+    """
+    Register a JSON serializer backend for `json_dumps`.
+    The backend must return JSON text with 2 spaces of indentation per level, "key": value separators,
+    and floats with the shortest representation that round-trips; `json_dumps` then adjusts
+    indentation, string escapes, and float formatting to match the standard library.
+    If the backend raises an exception, the standard library is used instead.
+
+    Parameters
+    ----------
+    name : str
+        Name of the backend
+    dumps : callable
+        Function taking the data and returning the JSON text. Non-JSON types should be passed to `json_serializer`.
+    module : str
+        Module that must be importable for the backend to be used. Default: None
+    """
+    _JSON_BACKENDS[name] = (module, dumps)
+    _resolve_json_backend.cache_clear()
+
+
+@functools.cache
+def _resolve_json_backend(name):
+    # Resolve a backend name (or auto: the first installed one) to an available backend
+    names = list(_JSON_BACKENDS) if name == "auto" else [name]
+    for backend in names:
+        if backend not in _JSON_BACKENDS:
+            raise RuntimeError(f"Unrecognized JSON backend {backend}")
+        module = _JSON_BACKENDS[backend][0]
+        try:
+            if module is not None:
+                __import__(module)
+            return backend
+        except ImportError as e:
+            if name != "auto":
+                raise RuntimeError(f"JSON backend {backend} requires {module} to be installed") from e
+    return "json"
+
+
+def json_dumps(data, backend="auto"):
+    """
+    Serialize data to JSON with 4-space indentation, as written by `astrodbkit.astrodb.Database.save_db`.
+    The output is identical to json.dumps(data, indent=4, default=json_serializer) for every backend,
+    but orjson or msgspec, when installed, are considerably faster.
+
+    Parameters
+    ----------
+    data : dict or list
+        Data to serialize
+    backend : str
+        JSON backend to use (orjson, msgspec, json, or any added with `register_json_backend`).
+        Default: auto (the first installed of orjson, msgspec, and json)
+
+    Returns
+    -------
+    JSON text
+    """
+
+    dumps = _JSON_BACKENDS[_resolve_json_backend(backend)][1]
+    status = 2 if dumps is None else _float_status(data)
+    if status < 2:
+        try:
+            return _normalize_json(dumps(data), floats=status == 1)
+        except Exception:  # pylint: disable=broad-except
+            pass  # data the backend cannot serialize (eg, numpy scalars) falls back to the standard library
+    return json.dumps(data, indent=4, default=json_serializer)
+
+
+def _has_nonfinite(rows):
+    # Whether any row has NaN/Infinity (written as null by fast encoders); rows are usually flat
+    for row in rows:
+        for value in row.values():
+            value_type = type(value)
+            if value_type is float or value_type is Decimal:
+                if not math.isfinite(value):
+                    return True
+            elif (value_type is dict or value_type is list or value_type is tuple) and _float_status(value) == 2:
+                return True
+    return False
+
+
+def _json_lines_orjson(rows):
+    import orjson  # noqa: PLC0415
+
+    option = orjson.OPT_APPEND_NEWLINE | orjson.OPT_PASSTHROUGH_DATETIME
+    return b"".join(_orjson_dumps(row, option) for row in rows)
+
+
+def _json_lines_msgspec(rows):
+    import msgspec  # noqa: PLC0415
+
+    encoder = msgspec.json.Encoder(enc_hook=json_serializer)
+    return b"".join(encoder.encode(row) + b"\n" for row in rows)
+
+
+# JSON Lines encoders matching the backends of json_dumps; the standard library is used for any other backend
+_JSON_LINE_ENCODERS = {"orjson": _json_lines_orjson, "msgspec": _json_lines_msgspec}
+
+
+def json_lines(rows, backend="auto"):
+    """
+    Serialize rows as JSON Lines: one compact JSON object per line, encoded as UTF-8.
+    Unlike `json_dumps`, the formatting may differ between backends, but the parsed values are the same.
+
+    Parameters
+    ----------
+    rows : list
+        List of dictionaries to serialize
+    backend : str
+        JSON backend to use (orjson, msgspec, or json). Default: auto (the first installed of orjson, msgspec, and json)
+
+    Returns
+    -------
+    bytes
+    """
+
+    name = _resolve_json_backend(backend)
+    if name in _JSON_LINE_ENCODERS and not _has_nonfinite(rows):
+        try:
+            return _JSON_LINE_ENCODERS[name](rows)
+        except Exception:  # pylint: disable=broad-except
+            pass  # eg, numpy scalars
+    return "".join(json.dumps(row, default=json_serializer) + "\n" for row in rows).encode("utf-8")
+
+
+def _json_loads_orjson(text):
+    import orjson  # noqa: PLC0415
+
+    return orjson.loads(text)
+
+
+def _json_loads_msgspec(text):
+    import msgspec  # noqa: PLC0415
+
+    return msgspec.json.decode(text)
+
+
+# JSON parsers matching the backends of json_dumps; the standard library is used for any other backend
+_JSON_PARSERS = {"orjson": _json_loads_orjson, "msgspec": _json_loads_msgspec}
+
+
+def json_loads(text, backend="auto"):
+    """
+    Parse JSON text, with orjson or msgspec when installed. Strings are not converted to other types
+    (see `datetime_json_parser` and `astrodbkit.astrodb.Database.load_json` for dates).
+
+    Parameters
+    ----------
+    text : str or bytes
+        JSON text
+    backend : str
+        JSON backend to use (orjson, msgspec, or json). Default: auto (the first installed of orjson, msgspec, and json)
+
+    Returns
+    -------
+    Parsed data
+    """
+
+    name = _resolve_json_backend(backend)
+    if name in _JSON_PARSERS:
+        try:
+            return _JSON_PARSERS[name](text)
+        except ValueError:
+            pass  # eg, NaN or integers beyond 64 bits; the standard library accepts them
+    return json.loads(text)
+
+
 def datetime_json_parser(json_dict):
     """Function to convert JSON dictionary objects to datetime when possible.
     This is required to get datetime objects into the database.
@@ -120,6 +389,8 @@ def get_simbad_names(name, verbose=False):
     List of names
     """
 
+    from astroquery.simbad import Simbad  # noqa: PLC0415
+
     t = Simbad.query_objectids(name)
     if t is not None and len(t) > 0:
         temp = [_name_formatter(s) for s in t["id"].tolist()]
@@ -44,8 +44,7 @@ def view_doesnt_exist(ddl, target, connection, **kw):
     return not view_exists(ddl, target, connection, **kw)
 
 
-def view(name, metadata, selectable):
-
+def view_table(name, selectable):
     t = sa.table(
         name,
         *(
@@ -54,6 +53,12 @@ def view(name, metadata, selectable):
         ),
     )
     t.primary_key.update(c for c in t.c if c.primary_key)
+    return t
+
+
+def view(name, metadata, selectable):
+
+    t = view_table(name, selectable)
 
     sa.event.listen(
         metadata,
@@ -66,3 +71,240 @@ def view(name, metadata, selectable):
         DropView(name).execute_if(callable_=view_exists),
     )
     return t
+
+
+# -------------------------------------------------------------------------------------------------------------------
+# Materialized views
+# PostgreSQL supports these natively. Other databases (eg, SQLite) store the rows in a table named
+# MATERIALIZED_VIEW_PREFIX + name, with a plain view of that table under the requested name.
+MATERIALIZED_VIEW_PREFIX = "astrodbkit_mv_"
+
+
+class CreateMaterializedView(DDLElement):
+    def __init__(self, name, selectable):
+        self.name = name
+        self.selectable = selectable
+
+
+class DropMaterializedView(DDLElement):
+    def __init__(self, name):
+        self.name = name
+
+
+@compiler.compiles(CreateMaterializedView)
+def _create_materialized_view(element, compiler, **kw):
+    # pylint: disable=consider-using-f-string
+    return "CREATE TABLE %s AS %s" % (
+        compiler.preparer.quote(MATERIALIZED_VIEW_PREFIX + element.name),
+        compiler.sql_compiler.process(element.selectable, literal_binds=True),
+    )
+
+
+@compiler.compiles(CreateMaterializedView, "postgresql")
+def _create_materialized_view_postgresql(element, compiler, **kw):
+    # pylint: disable=consider-using-f-string
+    return "CREATE MATERIALIZED VIEW %s AS %s" % (
+        compiler.preparer.quote(element.name),
+        compiler.sql_compiler.process(element.selectable, literal_binds=True),
+    )
+
+
+@compiler.compiles(DropMaterializedView)
+def _drop_materialized_view(element, compiler, **kw):
+    # pylint: disable=consider-using-f-string
+    return "DROP TABLE %s" % (compiler.preparer.quote(MATERIALIZED_VIEW_PREFIX + element.name))
+
+
+@compiler.compiles(DropMaterializedView, "postgresql")
+def _drop_materialized_view_postgresql(element, compiler, **kw):
+    # pylint: disable=consider-using-f-string
+    return "DROP MATERIALIZED VIEW %s" % (compiler.preparer.quote(element.name))
+
+
+def materialized_view_exists(ddl, target, connection, **kw):
+    # Names are quoted when created, so their case is kept; compare them as the inspector reports them
+    if connection.dialect.name == "postgresql":
+        names = sa.inspect(connection).get_materialized_view_names()
+        return connection.dialect.normalize_name(ddl.name) in names
+    names = sa.inspect(connection).get_table_names()
+    return connection.dialect.normalize_name(MATERIALIZED_VIEW_PREFIX + ddl.name) in names
+
+
+def materialized_view_doesnt_exist(ddl, target, connection, **kw):
+    return not materialized_view_exists(ddl, target, connection, **kw)
+
+
+def _emulated_view_exists(ddl, target, connection, **kw):
+    return connection.dialect.name != "postgresql" and view_exists(ddl, target, connection, **kw)
+
+
+def _emulated_view_doesnt_exist(ddl, target, connection, **kw):
+    return connection.dialect.name != "postgresql" and view_doesnt_exist(ddl, target, connection, **kw)
+
+
+def materialized_view(name, metadata, selectable, key=None):
+    """
+    Define a materialized view: the results of the selectable are stored when created
+    and only updated with `refresh_materialized_view`.
+    Like `view`, it is created and dropped along with the tables of the metadata.
+
+    Parameters
+    ----------
+    name : str
+        Name of the view
+    metadata : SQLAlchemy MetaData
+        Metadata to attach the create/drop events to
+    selectable : SQLAlchemy Select
+        Query that defines the view
+    key : str
+        Name of a column of the view (eg, source) used for incremental refreshes. Default: None
+
+    Returns
+    -------
+    t : SQLAlchemy TableClause
+        Table object to query the view
+    """
+
+    t = view_table(name, selectable)
+    t.definition = selectable
+    t.refresh_key = key
+
+    storage = sa.table(MATERIALIZED_VIEW_PREFIX + name, *(sa.column(c.name) for c in t.c))
+    t.create_ddl = [
+        CreateMaterializedView(name, selectable).execute_if(callable_=materialized_view_doesnt_exist),
+        CreateView(name, sa.select(storage)).execute_if(callable_=_emulated_view_doesnt_exist),
+    ]
+    t.drop_ddl = [
+        DropView(name).execute_if(callable_=_emulated_view_exists),
+        DropMaterializedView(name).execute_if(callable_=materialized_view_exists),
+    ]
+    for ddl in t.create_ddl:
+        sa.event.listen(metadata, "after_create", ddl)
+    for ddl in t.drop_ddl:
+        sa.event.listen(metadata, "before_drop", ddl)
+    return t
+
+
+def materialized_view_storage(dialect, name):
+    """Quoted name of the relation holding the rows of a materialized view, as created by its DDL (eg, to index it)"""
+    if dialect.name == "postgresql":
+        return dialect.identifier_preparer.quote(name)
+    return dialect.identifier_preparer.quote(MATERIALIZED_VIEW_PREFIX + name)
+
+
+def create_materialized_view(connection, mview):
+    """Create a materialized view, if it doesn't exist, without waiting for `MetaData.create_all`"""
+    for ddl in mview.create_ddl:
+        ddl(mview, connection)
+
+
+def drop_materialized_view(connection, mview):
+    """Drop a materialized view, if it exists, without waiting for `MetaData.drop_all`"""
+    for ddl in mview.drop_ddl:
+        ddl(mview, connection)
+
+
+def refresh_materialized_view(connection, mview, keys=None):
+    """
+    Update the stored rows of a materialized view.
+
+    Parameters
+    ----------
+    connection : SQLAlchemy Connection
+        Open connection; the caller commits (eg, use `engine.begin()`)
+    mview : SQLAlchemy TableClause
+        Materialized view returned by `materialized_view`
+    keys : list
+        Values of the view's key column to refresh, eg the sources that were modified.
+        Only those rows are recomputed. PostgreSQL has no partial refresh and always refreshes the full view.
+        Default: None (full refresh)
+    """
+
+    if connection.dialect.name == "postgresql":
+        name = connection.dialect.identifier_preparer.quote(mview.name)
+        connection.execute(sa.text(f"REFRESH MATERIALIZED VIEW {name}"))
+        return
+
+    if keys is not None and mview.refresh_key is None:
+        raise RuntimeError(f"Materialized view {mview.name} has no key for incremental refresh")
+
+    storage = sa.table(MATERIALIZED_VIEW_PREFIX + mview.name, *(sa.column(c.name) for c in mview.c))
+    delete = storage.delete()
+    selectable = mview.definition
+    if keys is not None:
+        delete = delete.where(storage.c[mview.refresh_key].in_(keys))
+        selectable = selectable.where(selectable.selected_columns[mview.refresh_key].in_(keys))
+
+    connection.execute(delete)
+    connection.execute(storage.insert().from_select([c.name for c in mview.c], selectable))
+
+
+def summary_selectable(metadata, spec, primary_table="Sources", primary_table_key="source", foreign_key="source"):
+    """
+    Build the query for a summary with one row per source from a declarative specification.
+    Each entry of the specification maps an output column name to a dictionary with:
+
+     - table: name of the table to take the value from
+     - column: name of the column in that table (optional when aggregate is count)
+     - where: dictionary of column values used to select rows, eg {"best": True} or {"band": "WISE_W1"} (optional)
+     - aggregate: name of a SQL aggregate, eg count, min, max, avg (optional).
+       Without it, the value of the first matching row is used.
+     - order_by: name of the column that orders the matching rows to pick the first one (optional).
+       Rows are then ordered by the primary key of the table, so the choice does not depend on the database.
+
+    For example::
+
+        spec = {
+            "ra": {"table": "Sources", "column": "ra"},
+            "spectral_type": {"table": "SpectralTypes", "column": "spectral_type", "where": {"best": True}},
+            "W1": {"table": "Photometry", "column": "magnitude", "where": {"band": "WISE_W1"}},
+            "n_spectra": {"table": "Spectra", "aggregate": "count"},
+        }
+
+    Parameters
+    ----------
+    metadata : SQLAlchemy MetaData
+        Database schema
+    spec : dict
+        Summary specification
+    primary_table : str
+        Name of the primary source table. Default: Sources
+    primary_table_key : str
+        Name of the primary key in the sources table. Default: source
+    foreign_key : str
+        Name of the foreign key in other tables that refer back to the primary table. Default: source
+
+    Returns
+    -------
+    selectable : SQLAlchemy Select
+        Query with the primary key followed by the columns of the specification
+    """
+
+    primary = metadata.tables[primary_table]
+    columns = [primary.c[primary_table_key].label(primary_table_key)]
+    for name, entry in spec.items():
+        if entry["table"] not in metadata.tables:
+            raise RuntimeError(f"Table {entry['table']} not in the database")
+        source_table = metadata.tables[entry["table"]]
+
+        if entry.get("aggregate") is not None:
+            argument = source_table.c[entry["column"]] if "column" in entry else sa.literal_column("*")
+            value = getattr(sa.func, entry["aggregate"])(argument)
+        else:
+            value = source_table.c[entry["column"]]
+
+        if entry["table"] == primary_table and entry.get("aggregate") is None and "where" not in entry:
+            # Columns of the primary table are selected directly
+            columns.append(value.label(name))
+            continue
+
+        subquery = sa.select(value).where(source_table.c[foreign_key] == primary.c[primary_table_key])
+        for column_name, column_value in entry.get("where", {}).items():
+            subquery = subquery.where(source_table.c[column_name] == column_value)
+        if entry.get("aggregate") is None:
+            order = [source_table.c[entry["order_by"]]] if "order_by" in entry else []
+            order += list(source_table.primary_key.columns) or [value]
+            subquery = subquery.order_by(*order).limit(1)
+        columns.append(subquery.scalar_subquery().label(name))
+
+    return sa.select(*columns).select_from(primary)
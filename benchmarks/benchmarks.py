@@ -0,0 +1,186 @@
+"""Benchmarks of Database hot paths on synthetic databases of increasing size, run with asv
+
+The synthetic databases are generated once (see data.database_path) and their paths are passed
+from setup_cache as the first argument of every setup and benchmark method.
+"""
+
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import sqlalchemy as sa
+from astropy.coordinates import SkyCoord
+from astropy.table import Table
+
+from astrodbkit.astrodb import Database, copy_database_schema, create_database
+
+from .data import SIZES, coordinates, database_path, generate_spectrum, source_name
+
+# Saving/loading writes one JSON file per source, so those only run for up to this many sources
+SAVE_LOAD_MAX_SIZE = 100000
+
+
+class QuerySuite:
+    """Read-only query methods"""
+
+    params = SIZES
+    param_names = ["n_sources"]
+
+    def setup_cache(self):
+        return {n_sources: database_path(n_sources) for n_sources in SIZES}
+
+    setup_cache.timeout = 3600
+
+    def setup(self, paths, n_sources):
+        self.db = Database("sqlite:///" + paths[n_sources])
+        self.coords = SkyCoord(*coordinates(n_sources), frame="icrs", unit="deg")
+        self.name = source_name(n_sources // 2)
+        self.cached_db = Database("sqlite:///" + paths[n_sources], coordinate_cache=True)
+        self.cached_db.query_region(self.coords, radius=60)
+        ra, dec = np.random.default_rng(0).uniform(0, 360, 10000), np.random.default_rng(1).uniform(-90, 90, 10000)
+        self.detections = SkyCoord(ra, dec, frame="icrs", unit="deg")
+        self.catalog = Table({"ra": ra, "dec": dec})
+
+    def teardown(self, paths, n_sources):
+        self.db.engine.dispose()
+        self.cached_db.engine.dispose()
+
+    def time_query_region(self, paths, n_sources):
+        self.db.query_region(self.coords, radius=60)
+
+    def time_query_region_cached(self, paths, n_sources):
+        self.cached_db.query_region(self.coords, radius=60)
+
+    def time_nearest(self, paths, n_sources):
+        self.cached_db.nearest(self.detections, k=1)
+
+    def time_spatial_join(self, paths, n_sources):
+        self.cached_db.spatial_join(self.catalog, radius=60)
+
+    def time_search_object(self, paths, n_sources):
+        self.db.search_object(self.name, verbose=False)
+
+    def time_search_object_exact(self, paths, n_sources):
+        self.db.search_object(self.name, fuzzy_search=False, verbose=False)
+
+    def time_search_string(self, paths, n_sources):
+        self.db.search_string("Alt 00012", verbose=False)
+
+    def time_inventory(self, paths, n_sources):
+        self.db.inventory(self.name)
+
+    def time_sql_query_pandas(self, paths, n_sources):
+        self.db.sql_query("SELECT * FROM Photometry", fmt="pandas")
+
+
+class WriteSuite:
+    """Adding data and copying databases; each run works on a fresh copy of the synthetic database"""
+
+    params = SIZES
+    param_names = ["n_sources"]
+    number = 1
+    repeat = 3
+    timeout = 3600
+
+    def setup_cache(self):
+        return {n_sources: database_path(n_sources) for n_sources in SIZES}
+
+    setup_cache.timeout = 3600
+
+    def setup(self, paths, n_sources):
+        import pandas as pd  # noqa: PLC0415
+
+        self.tempdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tempdir, "copy.db")
+        shutil.copy(paths[n_sources], self.path)
+        self.db = Database("sqlite:///" + self.path)
+        self.new_sources = pd.DataFrame(
+            [{"source": f"NEW {i}", "ra": 10.0, "dec": 10.0, "reference": "Ref00"} for i in range(1000)]
+        )
+
+    def teardown(self, paths, n_sources):
+        self.db.engine.dispose()
+        shutil.rmtree(self.tempdir)
+
+    def time_add_table_data(self, paths, n_sources):
+        self.db.add_table_data(self.new_sources, "Sources", fmt="pandas")
+
+    def time_copy_database_schema(self, paths, n_sources):
+        destination = "sqlite:///" + os.path.join(self.tempdir, "destination.db")
+        copy_database_schema("sqlite:///" + self.path, destination, copy_data=True)
+
+
+class SaveLoadSuite:
+    """Saving to and loading from JSON files and single-file archives"""
+
+    params = [n for n in SIZES if n <= SAVE_LOAD_MAX_SIZE]
+    param_names = ["n_sources"]
+    number = 1
+    repeat = 2
+    timeout = 3600
+
+    def setup_cache(self):
+        paths = {}
+        for n_sources in self.params:
+            path = database_path(n_sources)
+            directory = os.path.abspath(f"json_{n_sources}")
+            os.makedirs(directory, exist_ok=True)
+            db = Database("sqlite:///" + path)
+            db.save_database(directory)
+            archive = os.path.abspath(f"archive_{n_sources}.zip")
+            db.save_archive(archive)
+            db.engine.dispose()
+            paths[n_sources] = (path, directory, archive)
+        return paths
+
+    setup_cache.timeout = 3600
+
+    def setup(self, paths, n_sources):
+        self.tempdir = tempfile.mkdtemp()
+        self.db = Database("sqlite:///" + paths[n_sources][0])
+        connection_string = "sqlite:///" + os.path.join(self.tempdir, "empty.db")
+        create_database(connection_string)
+        self.empty_db = Database(connection_string)
+        os.makedirs(os.path.join(self.tempdir, "json"))
+
+    def teardown(self, paths, n_sources):
+        self.db.engine.dispose()
+        self.empty_db.engine.dispose()
+        shutil.rmtree(self.tempdir)
+
+    def time_save_database(self, paths, n_sources):
+        self.db.save_database(os.path.join(self.tempdir, "json"))
+
+    def time_load_database(self, paths, n_sources):
+        self.empty_db.load_database(paths[n_sources][1])
+
+    def time_save_archive(self, paths, n_sources):
+        self.db.save_archive(os.path.join(self.tempdir, "archive.zip"))
+
+    def time_load_archive(self, paths, n_sources):
+        self.empty_db.load_archive(paths[n_sources][2])
+
+
+class SpectraSuite:
+    """Converting query results with spectra"""
+
+    params = [10, 100]
+    param_names = ["n_spectra"]
+
+    def setup_cache(self):
+        spectrum = os.path.abspath("spectrum.fits")
+        generate_spectrum(spectrum)
+        return {"database": database_path(SIZES[0]), "spectrum": spectrum}
+
+    def setup(self, paths, n_spectra):
+        self.db = Database("sqlite:///" + paths["database"])
+        self.query = self.db.query(
+            self.db.Sources.c.source, sa.literal(paths["spectrum"]).label("access_url")
+        ).limit(n_spectra)
+
+    def teardown(self, paths, n_spectra):
+        self.db.engine.dispose()
+
+    def time_spectra(self, paths, n_spectra):
+        self.query.spectra(fmt="astropy")
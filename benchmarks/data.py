@@ -0,0 +1,159 @@
+"""Synthetic data generator for the benchmarks, following astrodbkit.schema_example
+
+Can also be run directly to create a database file, eg::
+
+    python benchmarks/data.py bench_100k.db --sources 100000
+"""
+
+import argparse
+import os
+import tempfile
+
+import numpy as np
+
+from astrodbkit.astrodb import create_database
+from astrodbkit.schema_example import *  # noqa: F403 (registers the example tables)
+
+# Number of sources to benchmark with; override with a comma-separated list in ASTRODBKIT_BENCH_SIZES
+SIZES = [int(n) for n in os.getenv("ASTRODBKIT_BENCH_SIZES", "10000,100000,1000000").split(",")]
+
+PUBLICATIONS = [f"Ref{i:02d}" for i in range(20)]
+TELESCOPES = ["2MASS", "WISE"]
+BANDS = [("2MASS.J", "2MASS"), ("WISE.W1", "WISE"), ("WISE.W2", "WISE")]
+
+# Rows per insert batch
+BATCH_SIZE = 50000
+
+
+def source_name(i):
+    """Name of the i-th synthetic source"""
+    return f"BENCH J{i:07d}"
+
+
+def _insert(conn, table, rows):
+    for start in range(0, len(rows), BATCH_SIZE):
+        conn.execute(table.insert(), rows[start : start + BATCH_SIZE])
+
+
+def generate_database(connection_string, n_sources, seed=42):
+    """
+    Create and populate a database with the example schema and n_sources synthetic sources.
+    Each source has coordinates uniformly distributed on the sky, one alternate name, and photometry in three bands;
+    a quarter of them also have a spectral type.
+
+    Parameters
+    ----------
+    connection_string : str
+        Connection string of the database to create
+    n_sources : int
+        Number of sources
+    seed : int
+        Seed for the random number generator, so that generated databases are reproducible. Default: 42
+    """
+
+    rng = np.random.default_rng(seed)
+    ra = rng.uniform(0, 360, n_sources)
+    dec = np.degrees(np.arcsin(rng.uniform(-1, 1, n_sources)))
+    references = rng.choice(PUBLICATIONS, n_sources)
+    magnitudes = rng.normal(14, 2, (n_sources, len(BANDS)))
+
+    session, base, engine = create_database(connection_string)
+    tables = base.metadata.tables
+    with engine.begin() as conn:
+        _insert(conn, tables["Publications"], [{"name": name, "description": "Synthetic"} for name in PUBLICATIONS])
+        _insert(conn, tables["Telescopes"], [{"name": name, "reference": PUBLICATIONS[0]} for name in TELESCOPES])
+        _insert(
+            conn,
+            tables["Sources"],
+            [
+                {"source": source_name(i), "ra": ra[i], "dec": dec[i], "reference": references[i]}
+                for i in range(n_sources)
+            ],
+        )
+        _insert(
+            conn,
+            tables["Names"],
+            [{"source": source_name(i), "other_name": f"Alt {i:07d}"} for i in range(n_sources)],
+        )
+        _insert(
+            conn,
+            tables["Photometry"],
+            [
+                {
+                    "source": source_name(i),
+                    "band": band,
+                    "magnitude": magnitudes[i, j],
+                    "magnitude_error": 0.05,
+                    "telescope": telescope,
+                    "reference": references[i],
+                }
+                for i in range(n_sources)
+                for j, (band, telescope) in enumerate(BANDS)
+            ],
+        )
+        _insert(
+            conn,
+            tables["SpectralTypes"],
+            [
+                {
+                    "source": source_name(i),
+                    "spectral_type": float(rng.uniform(60, 90)),
+                    "regime": "optical",
+                    "best": True,
+                    "reference": references[i],
+                }
+                for i in range(0, n_sources, 4)
+            ],
+        )
+    session.close()
+    engine.dispose()
+
+
+def generate_spectrum(filename, n_points=2000):
+    """Write a synthetic spectrum as a tabular FITS file that specutils can read"""
+    import astropy.units as u  # noqa: PLC0415
+    from astropy.table import QTable  # noqa: PLC0415
+
+    wavelength = np.linspace(1.0, 2.5, n_points) * u.um
+    flux = (1 + 0.1 * np.sin(wavelength.value * 20)) * u.erg / u.s / u.cm**2 / u.AA
+    QTable([wavelength, flux], names=["wavelength", "flux"]).write(filename, format="fits", overwrite=True)
+
+
+def coordinates(n_sources, seed=42):
+    """Coordinates of the first synthetic source, used as a cone search target"""
+    rng = np.random.default_rng(seed)
+    ra = rng.uniform(0, 360, n_sources)
+    dec = np.degrees(np.arcsin(rng.uniform(-1, 1, n_sources)))
+    return ra[0], dec[0]
+
+
+def database_path(n_sources, seed=42):
+    """
+    Path of the synthetic database of a given size. Generated databases are kept in ASTRODBKIT_BENCH_DIR
+    (default: astrodbkit_bench in the temporary directory) and reused by later benchmark runs.
+    """
+    directory = os.getenv("ASTRODBKIT_BENCH_DIR", os.path.join(tempfile.gettempdir(), "astrodbkit_bench"))
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"bench_{n_sources}_{seed}.db")
+    if not os.path.exists(path):
+        # Generate under a temporary name so an interrupted run does not leave a partial database
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        generate_database("sqlite:///" + temp_path, n_sources, seed=seed)
+        os.replace(temp_path, path)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic AstrodbKit database")
+    parser.add_argument("filename", help="SQLite file to create")
+    parser.add_argument("--sources", type=int, default=10000, help="Number of sources")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    args = parser.parse_args()
+
+    if os.path.exists(args.filename):
+        os.remove(args.filename)
+    generate_database("sqlite:///" + args.filename, args.sources, seed=args.seed)
+
+
+if __name__ == "__main__":
+    main()